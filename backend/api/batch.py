@@ -0,0 +1,160 @@
+"""Batch ingest: many CSVs (or zips of them) parsed in parallel worker processes.
+
+Every file is stored in the blob store and gets an IngestJob, so it shows
+up in /api/jobs/ like a single upload. The CPU-bound part runs in a
+ProcessPoolExecutor, one file per task: parsing, hashing, stats, sketches
+and the sidecar. The parent then writes every Dataset with one
+``bulk_create`` and applies the retention policy once. Content that is already
+stored, or repeated within the batch, is parsed only once.
+"""
+import multiprocessing, os, time, zipfile
+import django
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from .models import Dataset, IngestJob
+from . import columnar, metrics, retention, stats, storage
+from .ingest import ingest_csv, IngestError
+from .sketches import SketchSet
+
+HEARTBEAT_SECONDS = 30
+
+class BatchError(ValueError):
+    pass
+
+def expand(name, f):
+    """``(name, file)`` pairs for an upload: the CSVs inside a zip, or the file itself."""
+    if not name.lower().endswith('.zip'):
+        yield name, f
+        return
+    try:
+        archive = zipfile.ZipFile(f)
+    except zipfile.BadZipFile:
+        raise BatchError(f'{name}: not a zip file')
+    for info in archive.infolist():
+        base = os.path.basename(info.filename)
+        if info.is_dir() or not base.lower().endswith('.csv') or base.startswith('.'):
+            continue
+        if info.file_size > settings.INGEST_MAX_BYTES:
+            raise BatchError(f'{name}/{info.filename}: exceeds the {settings.INGEST_MAX_BYTES} byte limit')
+        with archive.open(info) as member:
+            yield base, member
+
+def _parse(blob):
+    """Worker process: ingest one stored blob. Returns plain data; nothing touches the database."""
+    sidecar = columnar.sidecar_name(blob)
+    try:
+        result = ingest_csv(storage.path(blob), sidecar_path=storage.path(sidecar))
+        # unsaved, only so the median pass can read the new sidecar
+        ds = Dataset(file=blob, sidecar=sidecar if result.sidecar_ok else '',
+                     row_index=result.row_index, row_count=result.row_count)
+        summary = stats.summarize_ingest(result, ds)
+    except IngestError as e:
+        return {'error': f'Invalid CSV: {e}'}
+    except Exception as e:  # reported per file; the rest of the batch goes on
+        return {'error': str(e)}
+    return {'rows': result.row_count, 'row_index': result.row_index, 'bytes': result.bytes_read,
+            'sidecar': ds.sidecar.name, 'stats': summary, 'sketches': result.sketches.to_dict()}
+
+def _shared(ds):
+    """What a duplicate of ``ds``'s content reuses from it."""
+    return {'rows': ds.row_count, 'row_index': ds.row_index, 'file': ds.file.name,
+            'sidecar': ds.sidecar.name, 'tier': ds.tier}
+
+def ingest(sources, workers=None):
+    """Store and ingest ``(name, file)`` pairs; returns per-file jobs and the batch throughput."""
+    started = time.perf_counter()
+    batch = []
+    try:
+        for name, f in sources:
+            if len(batch) == settings.BATCH_MAX_FILES:
+                raise BatchError(f'at most {settings.BATCH_MAX_FILES} files per batch')
+            # claimed straight away ('parsing'), so ingest workers leave them alone
+            batch.append(storage.store_upload(File(f, name=name), lambda blob, checksum, size: IngestJob.objects.create(
+                name=name, blob=blob, checksum=checksum, bytes_total=size, phase='parsing', attempts=1)))
+    except BaseException as e:
+        IngestJob.objects.filter(pk__in=[job.pk for job in batch]).update(
+            phase='failed', error=str(e) or type(e).__name__, updated=timezone.now())
+        storage.release([job.blob for job in batch])
+        raise
+    if not batch:
+        raise BatchError('no CSV files in the batch')
+
+    # one parse per distinct content that is not stored yet
+    known, todo = {}, {}
+    for job in batch:
+        if job.checksum in known or job.checksum in todo:
+            continue
+        existing = storage.find_existing(job.checksum)
+        metrics.cache('dedup', existing is not None)
+        if existing:
+            known[job.checksum] = _shared(existing)
+        else:
+            todo[job.checksum] = job.blob
+    workers = max(1, min(workers or settings.BATCH_INGEST_PROCESSES or os.cpu_count() or 1, len(todo) or 1))
+    parsed = {}
+    if todo:
+        # spawn, since forking a threaded server can copy held locks; django.setup
+        # runs before the first task is unpickled (unpickling imports the models)
+        with metrics.span('batch_parse'), ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup) as pool:
+            futures = {pool.submit(_parse, blob): checksum for checksum, blob in todo.items()}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=HEARTBEAT_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    parsed[futures[future]] = future.result()
+                # keeps jobs.recover() from taking the batch's jobs for abandoned
+                IngestJob.objects.filter(pk__in=[job.pk for job in batch], phase='parsing').update(updated=timezone.now())
+
+    datasets, failed = {}, []
+    with transaction.atomic():
+        # the parse took a while: re-read what duplicates share under the blob
+        # locks, since retention may have compressed or deleted it meanwhile
+        for checksum in sorted(known):
+            storage.lock(storage.blob_name(checksum))
+            existing = storage.find_existing(checksum)
+            if existing:
+                known[checksum] = _shared(existing)
+            else:
+                del known[checksum]
+                parsed[checksum] = {'error': 'the stored copy of this content was deleted during the batch; upload it again'}
+        for checksum, res in parsed.items():
+            if 'error' in res:
+                continue
+            metrics.inc('api_read_bytes_total', res['bytes'], source='ingest')
+            stats.store_summary(checksum, res['stats'], SketchSet.from_dict(res['sketches']))
+            known[checksum] = {'rows': res['rows'], 'row_index': res['row_index'],
+                               'file': todo[checksum], 'sidecar': res['sidecar']}
+        ok = [job for job in batch if job.checksum in known]
+        created = Dataset.objects.bulk_create([
+            Dataset(name=job.name, file=known[job.checksum]['file'], sidecar=known[job.checksum]['sidecar'],
+                    row_index=known[job.checksum]['row_index'], row_count=known[job.checksum]['rows'],
+                    checksum=job.checksum, tier=known[job.checksum].get('tier', 'hot')) for job in ok])
+        now = timezone.now()
+        for job, ds in zip(ok, created):
+            job.phase, job.dataset, job.rows, job.bytes_processed, job.updated = 'done', ds, ds.row_count, job.bytes_total, now
+            datasets[job.pk] = ds
+        for job in batch:
+            if job.pk not in datasets:
+                job.phase, job.error, job.updated = 'failed', parsed[job.checksum]['error'], now
+                failed.append(job)
+        IngestJob.objects.bulk_update(batch, ['phase', 'dataset', 'rows', 'bytes_processed', 'error', 'updated'])
+    storage.release([n for job in failed for n in (job.blob, columnar.sidecar_name(job.blob))])
+    # fresh copies of content that was already stored cold
+    storage.release([job.blob for job in batch if job.pk in datasets and datasets[job.pk].file.name != job.blob])
+    retention.prune()
+    seconds = time.perf_counter() - started
+    total = sum(job.bytes_total for job in batch)
+    return {
+        'jobs': batch,
+        'files': len(batch),
+        'failed': len(failed),
+        'bytes': total,
+        'workers': workers,
+        'seconds': round(seconds, 3),
+        'mb_per_s': round(total / 2**20 / seconds, 2) if seconds else None,
+    }
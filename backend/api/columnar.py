@@ -0,0 +1,148 @@
+import os, uuid
+from bisect import bisect_right
+import pandas as pd
+import pyarrow as pa
+from . import metrics
+
+# rows per record batch; a row range only decodes the batches it overlaps
+BATCH_ROWS = 65536
+
+def sidecar_name(csv_name):
+    return os.path.splitext(csv_name)[0] + '.arrow'
+
+def _promote(a, b):
+    if a.equals(b):
+        return a
+    if (pa.types.is_integer(a) or pa.types.is_floating(a)) and (pa.types.is_integer(b) or pa.types.is_floating(b)):
+        return pa.float64()
+    return pa.string()
+
+class SidecarWriter:
+    """Appends DataFrame chunks to an Arrow IPC file, widening the schema if a later chunk disagrees."""
+    def __init__(self, path, batch_rows=BATCH_ROWS):
+        self.path, self.tmp = path, f'{path}.{uuid.uuid4().hex}.tmp'
+        self.batch_rows = batch_rows
+        self.sink = self.writer = self.schema = None
+        # first row of every record batch, kept as the dataset's row index
+        self.offsets, self.rows = [], 0
+
+    def _open(self, schema):
+        self.schema = schema
+        self.sink = pa.OSFile(self.tmp, 'wb')
+        self.writer = pa.ipc.new_file(self.sink, schema)
+
+    def _close(self):
+        self.writer.close()
+        self.sink.close()
+        self.writer = self.sink = None
+
+    def _widen(self, chunk_schema):
+        schema = pa.schema([f.with_type(_promote(f.type, chunk_schema.field(f.name).type)) for f in self.schema])
+        self._close()
+        os.replace(self.tmp, self.tmp + '.old')
+        self._open(schema)
+        with pa.memory_map(self.tmp + '.old', 'r') as src:
+            old = pa.ipc.open_file(src)
+            for i in range(old.num_record_batches):
+                self.writer.write_batch(old.get_batch(i).cast(schema))
+        os.remove(self.tmp + '.old')
+
+    def write(self, df):
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+            if self.writer is None:
+                self._open(table.schema)
+            elif not table.schema.equals(self.schema):
+                try:
+                    table = table.cast(self.schema)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    self._widen(table.schema)
+                    table = table.cast(self.schema)
+            for batch in table.to_batches(max_chunksize=self.batch_rows):
+                self.writer.write_batch(batch)
+                self.offsets.append(self.rows)
+                self.rows += batch.num_rows
+            return True
+        except (pa.ArrowException, OSError):
+            self.abort()
+            return False
+
+    def close(self):
+        if self.writer is None:
+            return False
+        self._close()
+        os.replace(self.tmp, self.path)
+        return True
+
+    def abort(self):
+        if self.writer is not None:
+            try: self._close()
+            except (pa.ArrowException, OSError): pass
+        for p in (self.tmp, self.tmp + '.old'):
+            if os.path.exists(p): os.remove(p)
+
+def has_sidecar(ds):
+    return bool(ds.sidecar) and os.path.exists(ds.sidecar.path)
+
+def open_sidecar(ds):
+    return pa.ipc.open_file(pa.memory_map(ds.sidecar.path, 'r'))
+
+def _slice_batches(reader, start, stop, offsets=None, columns=None):
+    # with a row index, jump straight to the first overlapping batch;
+    # without one, walk batch lengths (metadata only on a memory map)
+    first = bisect_right(offsets, start) - 1 if offsets else 0
+    out, offset = [], offsets[first] if offsets else 0
+    for i in range(max(first, 0), reader.num_record_batches):
+        if stop is not None and offset >= stop:
+            break
+        batch = reader.get_batch(i)
+        n = batch.num_rows
+        if offset + n > start:
+            if columns is not None:
+                batch = batch.select(columns)
+            lo = max(start - offset, 0)
+            hi = n if stop is None else min(stop - offset, n)
+            out.append(batch.slice(lo, hi - lo))
+        offset += n
+    return out
+
+def column_names(ds):
+    if has_sidecar(ds):
+        return open_sidecar(ds).schema.names
+    return list(pd.read_csv(ds.file.path, nrows=0).columns)
+
+def read_numeric(ds):
+    if has_sidecar(ds):
+        schema = open_sidecar(ds).schema
+        cols = [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+        return read_frame(ds, columns=cols)
+    return pd.read_csv(ds.file.path).select_dtypes(include='number')
+
+def read_frame(ds, columns=None, start=0, stop=None, categorical=False):
+    """Load ``columns`` for rows ``[start, stop)``, from the sidecar when present.
+
+    ``categorical`` dictionary-encodes string columns (Type, Material, ...).
+    """
+    if has_sidecar(ds):
+        with metrics.span('read_sidecar'):
+            reader = open_sidecar(ds)
+            schema = reader.schema
+            if columns is not None:
+                columns = [c for c in columns if c in schema.names]
+                schema = pa.schema([schema.field(c) for c in columns])
+            batches = _slice_batches(reader, start, stop, ds.row_index or None, columns)
+            metrics.inc('api_read_bytes_total', sum(b.nbytes for b in batches), source='sidecar')
+            return pa.Table.from_batches(batches, schema=schema).to_pandas(strings_to_categorical=categorical)
+    kwargs = {}
+    if columns is not None:
+        kwargs['usecols'] = lambda c: c in columns
+    if start:
+        kwargs['skiprows'] = range(1, start + 1)
+    if stop is not None:
+        kwargs['nrows'] = max(stop - start, 0)
+    with metrics.span('read_csv'):
+        df = pd.read_csv(ds.file.path, **kwargs)
+    if categorical:
+        obj = df.select_dtypes(include='object').columns
+        df[obj] = df[obj].astype('category')
+    return df
@@ -0,0 +1,71 @@
+import pandas as pd
+from . import columnar, framecache, stats
+
+DEFAULT_KEY = 'Equipment ID'
+DEFAULT_PARAMS = ['Flowrate', 'Pressure', 'Temperature']
+COMPARED = ['count', 'mean', 'median', 'min', 'max', 'std']
+
+class CompareError(ValueError):
+    pass
+
+def _delta(a, b):
+    return None if a is None or b is None else b - a
+
+def summary_trend(datasets):
+    """Per-parameter stats for each dataset plus deltas between consecutive ones, from stored summaries."""
+    summaries = [stats.summary_for(ds).stats for ds in datasets]
+    params = [p for p in summaries[0] if all(p in s for s in summaries[1:])]
+    out = {}
+    for p in params:
+        values = {k: [s[p].get(k) for s in summaries] for k in COMPARED}
+        out[p] = {'values': values,
+                  'delta': {k: [_delta(a, b) for a, b in zip(v, v[1:])] for k, v in values.items()}}
+    return out
+
+def equipment_changes(datasets, key=DEFAULT_KEY, params=None, changed_only=True, limit=1000):
+    """Join the datasets on ``key`` and report each parameter per equipment across them."""
+    names = [set(columnar.column_names(ds)) for ds in datasets]
+    if not all(key in n for n in names):
+        raise CompareError(f'key column {key!r} is missing from some datasets')
+    params = [p for p in (params or DEFAULT_PARAMS) if all(p in n for n in names)]
+    if not params:
+        raise CompareError('no compared parameter is present in every dataset')
+    frames, duplicates = [], {}
+    for ds in datasets:
+        df = framecache.widen(framecache.get(ds, columns=[key] + params)[[key] + params])
+        dup = int(df[key].duplicated(keep='last').sum())
+        if dup:
+            duplicates[ds.pk] = dup
+        frames.append(df.drop_duplicates(key, keep='last').set_index(key))
+    # hash join on the key index; each dataset becomes one column group
+    joined = pd.concat(frames, axis=1, keys=range(len(frames)), join='outer')
+    present = pd.DataFrame({i: joined.index.isin(f.index) for i, f in enumerate(frames)}, index=joined.index)
+    in_first, in_last = present.iloc[:, 0], present.iloc[:, -1]
+    # delta is last minus first; "changed" means any step along the way moved or the ID came/went
+    deltas = {p: joined[(len(frames) - 1, p)] - joined[(0, p)] for p in params}
+    changed = present.ne(present.iloc[:, 0], axis=0).any(axis=1)
+    for p in params:
+        steps = joined.xs(p, axis=1, level=1).diff(axis=1).iloc[:, 1:]
+        changed |= steps.fillna(0).ne(0).any(axis=1)
+    rows = joined[changed] if changed_only else joined
+    total = len(rows)
+    rows = rows.head(limit)
+    # NaN -> None and numpy scalars -> Python, column-wise
+    plain = lambda a: pd.Series(a, dtype=object).where(pd.notna(a), None).tolist()
+    values = {p: [plain(rows[(i, p)].to_numpy()) for i in range(len(frames))] for p in params}
+    delta = {p: plain(deltas[p].reindex(rows.index).to_numpy()) for p in params}
+    keys = plain(rows.index.to_numpy())
+    return {
+        'key': key,
+        'parameters': params,
+        'matched': int(present.all(axis=1).sum()),
+        'added': plain(joined.index[~in_first & in_last].to_numpy()),
+        'removed': plain(joined.index[in_first & ~in_last].to_numpy()),
+        'duplicates': duplicates,
+        'changed': int(changed.sum()),
+        'total': total,
+        'rows': [
+            {key: k, **{p: {'values': [values[p][i][r] for i in range(len(frames))], 'delta': delta[p][r]} for p in params}}
+            for r, k in enumerate(keys)
+        ],
+    }
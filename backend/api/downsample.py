@@ -0,0 +1,76 @@
+import numpy as np
+from django.core.cache import cache
+from . import columnar, framecache, metrics
+
+METHODS = ('lttb', 'minmax')
+MAX_POINTS = 20000
+
+class SeriesError(ValueError):
+    pass
+
+def lttb(x, y, n):
+    """Indices of the points kept by largest-triangle-three-buckets."""
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+    # bucket edges for the size-2 interior points; first and last are always kept
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    out = np.empty(n, dtype=np.int64)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < n - 1 else size
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # twice the triangle area against the previous pick and next bucket's centroid
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def minmax(x, y, n):
+    """Indices of each bucket's min and max y (n/2 buckets), in x order."""
+    size = len(x)
+    if n >= size or n < 2:
+        return np.arange(size)
+    buckets = n // 2
+    edges = np.linspace(0, size, buckets + 1).astype(np.int64)[:-1]
+    ids = np.repeat(np.arange(buckets), np.diff(np.append(edges, size)))
+    order = np.lexsort((y, ids))  # by bucket, then y
+    counts = np.bincount(ids, minlength=buckets)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    picks = np.concatenate([order[starts], order[starts + counts - 1]])
+    return np.unique(picks)
+
+def series(ds, x, ys, points, method='lttb'):
+    if method not in METHODS:
+        raise SeriesError(f'method must be one of {", ".join(METHODS)}')
+    points = max(3, min(points, MAX_POINTS))
+    key = f'series:{ds.checksum}:{x}:{",".join(ys)}:{points}:{method}'
+    hit = cache.get(key)
+    metrics.cache('series', hit is not None)
+    if hit is not None:
+        return hit
+    names = columnar.column_names(ds)
+    unknown = [c for c in ([x] if x else []) + ys if c not in names]
+    if unknown:
+        raise SeriesError(f'Unknown columns: {", ".join(unknown)}')
+    wanted = ([x] if x else []) + ys
+    df = framecache.get(ds, columns=wanted)[wanted]
+    pick = lttb if method == 'lttb' else minmax
+    out = {'x': x or 'row', 'points': points, 'method': method, 'total': len(df), 'series': {}}
+    for y in ys:
+        cols = df[[x, y]] if x else df[[y]]
+        try:
+            cols = cols.astype('float64').dropna()
+        except ValueError:
+            raise SeriesError(f'{x} and {y} must be numeric' if x else f'{y} must be numeric')
+        xv = cols[x].to_numpy() if x else cols.index.to_numpy(dtype='float64')
+        yv = cols[y].to_numpy()
+        if x:
+            order = np.argsort(xv, kind='stable')
+            xv, yv = xv[order], yv[order]
+        idx = pick(xv, yv, points)
+        out['series'][y] = {'x': xv[idx].tolist(), 'y': yv[idx].tolist()}
+    cache.set(key, out, timeout=None)
+    return out
@@ -0,0 +1,151 @@
+"""Process-wide LRU cache of whole datasets as compact DataFrames.
+
+Frames are keyed by ``(pk, checksum)`` and stored compact:
+
+- string columns with repeated values become categoricals
+- integers are downcast
+- floats become float32 only when every value survives the round trip
+
+Entries are evicted least recently used first to stay under
+``FRAME_CACHE_BYTES``. Cached frames are shared between requests and must
+not be modified. Use ``widen()`` on a slice or projection before handing
+it to code that expects float64 and plain strings.
+
+With ``FRAME_CACHE_SHARED_DIR`` set (e.g. a directory under /dev/shm),
+compact frames are also written there as Arrow files, one per checksum.
+Every worker process memory-maps the same file, so the numeric columns
+are shared pages rather than one copy per worker.
+"""
+import os, threading, uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from django.conf import settings
+from . import columnar, metrics
+from .models import Dataset
+
+# string columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+_lock = threading.Lock()
+_frames = OrderedDict()  # (pk, checksum) -> (frame, nbytes)
+_bytes = 0
+
+def compact(df):
+    """A copy of ``df`` with smaller dtypes wherever no value changes."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        # pandas >= 3 reads text as the 'str' dtype rather than object
+        if s.dtype == object or (pd.api.types.is_string_dtype(s) and not isinstance(s.dtype, pd.CategoricalDtype)):
+            if s.nunique(dropna=True) <= CATEGORY_RATIO * len(s):
+                s = s.astype('category')
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            s = pd.to_numeric(s, downcast='integer')
+        elif s.dtype == np.float64:
+            small = s.to_numpy().astype(np.float32)
+            if np.array_equal(small.astype(np.float64), s.to_numpy(), equal_nan=True):
+                s = pd.Series(small, index=s.index, name=col)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+def widen(df, categories=True):
+    """float32 back to float64 and, with ``categories``, categoricals back to plain columns."""
+    types = {}
+    for col, t in df.dtypes.items():
+        if t == np.float32:
+            types[col] = np.float64
+        elif categories and isinstance(t, pd.CategoricalDtype):
+            types[col] = t.categories.dtype
+    return df.astype(types) if types else df
+
+def _shared_path(checksum):
+    return os.path.join(settings.FRAME_CACHE_SHARED_DIR, f'{checksum}.arrow')
+
+def _write_shared(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # NaN stays a float value instead of a null, so numeric columns map back without a copy
+    arrays = [pa.array(df[c].to_numpy(), from_pandas=False) if df[c].dtype.kind == 'f'
+              else pa.Array.from_pandas(df[c]) for c in df.columns]
+    table = pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+def _read_shared(path):
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(split_blocks=True)
+
+def _load(ds):
+    if not settings.FRAME_CACHE_SHARED_DIR or not ds.checksum:
+        return compact(columnar.read_frame(ds))
+    path = _shared_path(ds.checksum)
+    if not os.path.exists(path):
+        _write_shared(compact(columnar.read_frame(ds)), path)
+    return _read_shared(path)
+
+def get(ds, load=True, columns=None):
+    """The compact frame of every row and column of ``ds``.
+
+    On a miss the dataset is read and cached, or None is returned when
+    ``load`` is false. With the cache disabled (``FRAME_CACHE_BYTES`` 0 and
+    no shared directory) a miss reads only ``columns``, when given, so
+    callers must still select the columns they use.
+    """
+    global _bytes
+    key = (ds.pk, ds.checksum)
+    with _lock:
+        entry = _frames.get(key)
+        if entry is not None:
+            _frames.move_to_end(key)
+    metrics.cache('frames', entry is not None)
+    if entry is not None:
+        return entry[0]
+    if not load:
+        return None
+    budget = settings.FRAME_CACHE_BYTES
+    if budget <= 0 and not settings.FRAME_CACHE_SHARED_DIR:
+        with metrics.span('frame_load'):
+            return compact(columnar.read_frame(ds, columns=columns))
+    with metrics.span('frame_load'):
+        df = _load(ds)
+    nbytes = int(df.memory_usage(deep=True).sum())
+    if nbytes > budget:
+        return df  # too big to keep; served once
+    with _lock:
+        if key not in _frames:
+            _frames[key] = (df, nbytes)
+            _bytes += nbytes
+        while _bytes > budget:
+            _, (_, size) = _frames.popitem(last=False)
+            _bytes -= size
+            metrics.inc('api_frame_cache_evictions_total')
+        _report()
+    return df
+
+def invalidate(keys):
+    """Forget deleted datasets, given as ``(pk, checksum)`` pairs taken before the delete.
+
+    Shared files go once no remaining dataset has that content.
+    """
+    global _bytes
+    keys = set(keys)
+    pks = {pk for pk, _ in keys}
+    with _lock:
+        for key in [k for k in _frames if k[0] in pks]:
+            _bytes -= _frames.pop(key)[1]
+        _report()
+    if settings.FRAME_CACHE_SHARED_DIR:
+        gone = {c for _, c in keys if c} - set(Dataset.objects.values_list('checksum', flat=True))
+        for checksum in gone:
+            # workers that mapped it keep their copy until they evict it
+            try:
+                os.remove(_shared_path(checksum))
+            except FileNotFoundError:
+                pass
+
+def _report():
+    metrics.gauge('api_frame_cache_bytes', _bytes)
+    metrics.gauge('api_frame_cache_entries', len(_frames))
@@ -0,0 +1,132 @@
+import csv, hashlib, io
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from . import columnar, metrics
+from .sketches import SketchSet
+
+class IngestError(Exception):
+    pass
+
+def checksum_file(fpath):
+    h = hashlib.sha256()
+    with open(fpath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class HashingReader(io.RawIOBase):
+    """File wrapper that hashes and counts bytes as the CSV parser pulls them."""
+    def __init__(self, f, max_bytes=None):
+        self.f = f
+        self.max_bytes = max_bytes
+        self.sha = hashlib.sha256()
+        self.bytes_read = 0
+    def readable(self): return True
+    def readinto(self, b):
+        data = self.f.read(len(b))
+        n = len(data)
+        b[:n] = data
+        self._account(data)
+        return n
+    def readline(self, size=-1):
+        data = self.f.readline(size)
+        self._account(data)
+        return data
+    def _account(self, data):
+        self.sha.update(data)
+        self.bytes_read += len(data)
+        if self.max_bytes and self.bytes_read > self.max_bytes:
+            raise IngestError(f'file exceeds the {self.max_bytes} byte limit')
+    def drain(self):
+        for chunk in iter(lambda: self.f.read(1 << 20), b''):
+            self._account(chunk)
+
+def _merge_dtype(a, b):
+    if a is None or a == b:
+        return b
+    if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+        return np.dtype('float64')
+    return np.dtype('object')
+
+class IngestResult:
+    def __init__(self):
+        self.row_count = 0
+        self.bytes_read = 0
+        self.checksum = ''
+        self.header = []
+        self.dtypes = {}
+        self.sketches = SketchSet()
+        self.sidecar_ok = False
+        self.row_index = []
+    @property
+    def stats(self):
+        return self.sketches.moments
+    @property
+    def numeric_columns(self):
+        return [c for c, t in self.dtypes.items() if pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t)]
+
+def _read_header(reader):
+    line = reader.readline()
+    if not line.strip():
+        raise IngestError('missing header row')
+    header = next(csv.reader([line.decode('utf-8-sig')]))
+    header = [h.strip() for h in header]
+    if any(not h for h in header):
+        raise IngestError('header has empty column names')
+    dupes = sorted({h for h in header if header.count(h) > 1})
+    if dupes:
+        raise IngestError(f'duplicate columns in header: {", ".join(dupes)}')
+    return header
+
+def ingest_csv(fpath, sidecar_path=None, chunk_rows=None, max_bytes=None, max_rows=None, progress=None):
+    """Validate, count, hash, infer the schema, gather stats and write the sidecar in one pass."""
+    chunk_rows = chunk_rows or settings.INGEST_CHUNK_ROWS
+    max_bytes = max_bytes if max_bytes is not None else settings.INGEST_MAX_BYTES
+    max_rows = max_rows if max_rows is not None else settings.INGEST_MAX_ROWS
+    res = IngestResult()
+    writer = columnar.SidecarWriter(sidecar_path) if sidecar_path else None
+    try:
+        with open(fpath, 'rb') as f:
+            reader = HashingReader(f, max_bytes)
+            res.header = _read_header(reader)
+            try:
+                chunks = pd.read_csv(io.BufferedReader(reader), header=None, names=res.header, chunksize=chunk_rows)
+                while True:
+                    # the reader is lazy: each chunk is parsed as it is pulled
+                    with metrics.span('parse'):
+                        chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    res.row_count += len(chunk)
+                    if max_rows and res.row_count > max_rows:
+                        raise IngestError(f'file exceeds the {max_rows} row limit')
+                    for col, t in chunk.dtypes.items():
+                        res.dtypes[col] = _merge_dtype(res.dtypes.get(col), t)
+                    with metrics.span('sketches'):
+                        res.sketches.update(chunk)
+                    with metrics.span('sidecar_write'):
+                        if writer and not writer.write(chunk):
+                            writer = None
+                    if progress:
+                        progress(reader.bytes_read, res.row_count)
+            except pd.errors.EmptyDataError:
+                pass  # header only
+            except (pd.errors.ParserError, UnicodeDecodeError, ValueError) as e:
+                raise IngestError(str(e))
+            reader.drain()
+        for col in res.header:
+            res.dtypes.setdefault(col, np.dtype('object'))
+        # columns that turned non-numeric in a later chunk carry no stats
+        res.sketches.restrict(res.numeric_columns)
+        res.checksum = reader.sha.hexdigest()
+        res.bytes_read = reader.bytes_read
+        metrics.inc('api_read_bytes_total', res.bytes_read, source='ingest')
+        if writer:
+            res.sidecar_ok = writer.close()
+            res.row_index = writer.offsets if res.sidecar_ok else []
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+    return res
@@ -0,0 +1,109 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Dataset, IngestJob
+from . import columnar, metrics, retention, stats, storage
+from .ingest import ingest_csv, IngestError
+
+log = logging.getLogger(__name__)
+_executor = None
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.INGEST_WORKERS, thread_name_prefix='ingest')
+        # jobs left behind by a process that died, plus any it queued but never started
+        recover()
+        for pk in IngestJob.objects.filter(phase='queued').order_by('created').values_list('pk', flat=True):
+            _executor.submit(_run_in_thread, pk)
+    return _executor
+
+def enqueue(name, blob, checksum, size):
+    job = IngestJob.objects.create(name=name, blob=blob, checksum=checksum, bytes_total=size)
+    if settings.INGEST_WORKERS:
+        # after commit: enqueue may run inside storage.place's transaction
+        transaction.on_commit(lambda: _pool().submit(_run_in_thread, job.pk))
+    return job
+
+def claim(pk):
+    return IngestJob.objects.filter(pk=pk, phase='queued').update(
+        phase='parsing', attempts=F('attempts') + 1, updated=timezone.now()) == 1
+
+def recover(now=None):
+    """Requeue claimed jobs that stopped reporting progress, or fail them once out of attempts.
+
+    Running jobs touch ``updated`` as they go, so a job older than
+    ``INGEST_STALE_SECONDS`` lost its worker (a crashed web process,
+    ingest_worker or batch request). Returns (requeued, failed).
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.INGEST_STALE_SECONDS)
+    stale = IngestJob.objects.exclude(phase__in=['queued', 'done', 'failed']).filter(updated__lt=cutoff)
+    # the dataset exists already; a missing summary is rebuilt on first read
+    stale.filter(dataset__isnull=False).update(phase='done', updated=timezone.now())
+    failed = list(stale.filter(attempts__gte=settings.INGEST_MAX_ATTEMPTS).values_list('pk', 'blob'))
+    IngestJob.objects.filter(pk__in=[pk for pk, _ in failed]).update(
+        phase='failed', error='the ingest worker stopped', updated=timezone.now())
+    storage.release([blob for _, blob in failed])
+    requeued = stale.filter(attempts__lt=settings.INGEST_MAX_ATTEMPTS).update(
+        phase='queued', bytes_processed=0, rows=0, updated=timezone.now())
+    if requeued or failed:
+        log.warning('recovered stale ingest jobs: %d requeued, %d failed', requeued, len(failed))
+    return requeued, len(failed)
+
+def _run_in_thread(pk):
+    close_old_connections()
+    try:
+        if claim(pk):
+            run(IngestJob.objects.get(pk=pk))
+    finally:
+        close_old_connections()
+
+def _set(job, **fields):
+    for k, v in fields.items():
+        setattr(job, k, v)
+    IngestJob.objects.filter(pk=job.pk).update(updated=timezone.now(), **fields)
+
+def run(job):
+    """Ingest a claimed job's blob into a Dataset, then apply the retention policy."""
+    try:
+        with transaction.atomic():
+            # retention.compress_cold() swaps the blob for its .gz under the same
+            # lock, so the file name copied here cannot be deleted before the create
+            storage.lock(job.blob)
+            existing = storage.find_existing(job.checksum)
+            if existing:
+                # same bytes already ingested: share the blob, sidecar and summary
+                ds = Dataset.objects.create(name=job.name, file=existing.file.name, sidecar=existing.sidecar.name,
+                                            row_index=existing.row_index, row_count=existing.row_count,
+                                            checksum=job.checksum, tier=existing.tier)
+        metrics.cache('dedup', existing is not None)
+        if existing:
+            _set(job, bytes_processed=job.bytes_total, rows=ds.row_count)
+        else:
+            sidecar = columnar.sidecar_name(job.blob)
+            progress = lambda nbytes, rows: _set(job, bytes_processed=nbytes, rows=rows)
+            result = ingest_csv(storage.path(job.blob), sidecar_path=storage.path(sidecar), progress=progress)
+            _set(job, phase='summarizing', bytes_processed=result.bytes_read, rows=result.row_count)
+            ds = Dataset.objects.create(name=job.name, file=job.blob, checksum=result.checksum,
+                                        row_count=result.row_count, row_index=result.row_index,
+                                        sidecar=sidecar if result.sidecar_ok else '')
+            _set(job, dataset=ds)
+            with metrics.span('stats'):
+                stats.store_summary(ds.checksum, stats.summarize_ingest(result, ds), result.sketches)
+        _set(job, phase='pruning', dataset=ds)
+        retention.prune()
+        _set(job, phase='done')
+        if ds.file.name != job.blob:
+            # the content was already stored cold (gzipped); the fresh copy is not needed
+            storage.release([job.blob])
+    except IngestError as e:
+        _set(job, phase='failed', error=f'Invalid CSV: {e}')
+        storage.release([job.blob])
+    except Exception as e:
+        log.exception('ingest job %s failed', job.pk)
+        _set(job, phase='failed', error=str(e))
+        storage.release([job.blob])
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api import retention
+
+class Command(BaseCommand):
+    help = 'Delete datasets outside the retention policy and compress cold ones (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='only list the datasets that would be deleted')
+        parser.add_argument('--no-compress', action='store_true', help='skip moving old datasets to the cold tier')
+        parser.add_argument('--limit', type=int, default=0, help='compress at most this many files per run')
+
+    def handle(self, *args, **opts):
+        if opts['dry_run']:
+            ids = sorted(retention.expired())
+            self.stdout.write(f'{len(ids)} datasets past retention: {ids}')
+            return
+        deleted = retention.prune()
+        compressed = 0 if opts['no_compress'] else retention.compress_cold(limit=opts['limit'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f'deleted {deleted} datasets, compressed {compressed} files '
+            f'(cold after {settings.RETENTION_COLD_AFTER_DAYS:g} days)'))
@@ -0,0 +1,29 @@
+import os
+from django.core.management.base import BaseCommand
+from api.models import Dataset
+from api import columnar, stats
+from api.ingest import checksum_file
+
+class Command(BaseCommand):
+    help = 'Compute and store summary statistics for datasets that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='recompute even if a summary exists')
+
+    def handle(self, *args, **opts):
+        done = skipped = 0
+        for ds in Dataset.objects.order_by('pk'):
+            if not ds.file or not os.path.exists(ds.file.path):
+                self.stderr.write(f'{ds.pk}: missing file {ds.file.name}')
+                skipped += 1
+                continue
+            if not ds.checksum:
+                ds.checksum = checksum_file(ds.file.path)
+                ds.save(update_fields=['checksum'])
+            if not opts['force'] and stats.get_summary(ds) is not None:
+                skipped += 1
+                continue
+            stats.store_summary(ds.checksum, stats.summarize(columnar.read_numeric(ds)))
+            done += 1
+            self.stdout.write(f'{ds.pk}: {ds.name}')
+        self.stdout.write(self.style.SUCCESS(f'backfilled {done}, skipped {skipped}'))
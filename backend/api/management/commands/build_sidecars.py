@@ -0,0 +1,32 @@
+import os
+from django.core.management.base import BaseCommand
+from api.models import Dataset
+from api import columnar, storage
+from api.ingest import ingest_csv, IngestError
+
+class Command(BaseCommand):
+    help = 'Write Arrow sidecars and row indexes for datasets stored before they existed'
+
+    def handle(self, *args, **opts):
+        built, seen = 0, set()
+        for ds in Dataset.objects.order_by('pk'):
+            if ds.file.name in seen or (columnar.has_sidecar(ds) and ds.row_index):
+                continue
+            seen.add(ds.file.name)
+            if not ds.file or not os.path.exists(ds.file.path):
+                self.stderr.write(f'{ds.pk}: missing file {ds.file.name}')
+                continue
+            sidecar = columnar.sidecar_name(ds.file.name)
+            try:
+                result = ingest_csv(ds.file.path, sidecar_path=storage.path(sidecar))
+            except IngestError as e:
+                self.stderr.write(f'{ds.pk}: {e}')
+                continue
+            if not result.sidecar_ok:
+                self.stderr.write(f'{ds.pk}: could not write a sidecar')
+                continue
+            # datasets sharing the blob share the sidecar too
+            n = Dataset.objects.filter(file=ds.file.name).update(sidecar=sidecar, row_index=result.row_index, row_count=result.row_count)
+            built += 1
+            self.stdout.write(f'{ds.pk}: {ds.name} ({n} datasets)')
+        self.stdout.write(self.style.SUCCESS(f'built {built} sidecars'))
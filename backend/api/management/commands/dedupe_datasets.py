@@ -0,0 +1,34 @@
+import os
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from api.models import Dataset
+from api import columnar, storage
+from api.ingest import checksum_file
+
+class Command(BaseCommand):
+    help = 'Move stored datasets into the content-addressed layout and drop duplicate copies'
+
+    def handle(self, *args, **opts):
+        moved = 0
+        for ds in Dataset.objects.order_by('pk'):
+            if not ds.file or not os.path.exists(ds.file.path):
+                self.stderr.write(f'{ds.pk}: missing file {ds.file.name}')
+                continue
+            if not ds.checksum:
+                ds.checksum = checksum_file(ds.file.path)
+            old = storage.files_of([ds])
+            blob = storage.blob_name(ds.checksum)
+            sidecar = columnar.sidecar_name(blob)
+            if ds.file.name in (blob, blob + '.gz'):  # already in place (the .gz is the cold tier)
+                continue
+            if not default_storage.exists(blob):
+                os.link(ds.file.path, default_storage.path(blob))
+            if ds.sidecar and os.path.exists(ds.sidecar.path) and not default_storage.exists(sidecar):
+                os.link(ds.sidecar.path, default_storage.path(sidecar))
+            ds.file.name = blob
+            ds.sidecar.name = sidecar if default_storage.exists(sidecar) else ''
+            ds.save()
+            storage.release(old)
+            moved += 1
+            self.stdout.write(f'{ds.pk}: {ds.name} -> {blob}')
+        self.stdout.write(self.style.SUCCESS(f'moved {moved} datasets'))
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from api import synthetic
+
+class Command(BaseCommand):
+    help = 'Write a synthetic equipment CSV (same columns as sample_equipment_data.csv)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--rows', type=float, default=100_000, help='row count; 1e6 style accepted')
+        parser.add_argument('--nan-ratio', type=float, default=0.0, help='share of blank cells in the nullable columns')
+        parser.add_argument('--types', type=int, default=5, help='distinct equipment types')
+        parser.add_argument('--materials', type=int, default=5, help='distinct materials')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-rows', type=int, default=100_000)
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        try:
+            size = synthetic.write_csv(opts['path'], int(opts['rows']), nan_ratio=opts['nan_ratio'],
+                                       types=opts['types'], materials=opts['materials'],
+                                       seed=opts['seed'], chunk_rows=opts['chunk_rows'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{opts["path"]}: {int(opts["rows"])} rows, {size / 2**20:.1f} MB in {elapsed:.1f}s')
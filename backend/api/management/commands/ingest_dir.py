@@ -0,0 +1,37 @@
+import glob, os
+from django.core.management.base import BaseCommand, CommandError
+from api import batch
+
+class Command(BaseCommand):
+    help = 'Ingest every CSV (and every CSV inside a zip) in a directory, parsing files in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--workers', type=int, default=0, help='parser processes (default: BATCH_INGEST_PROCESSES or one per CPU)')
+        parser.add_argument('--recursive', action='store_true', help='include subdirectories')
+
+    def handle(self, *args, **opts):
+        if not os.path.isdir(opts['path']):
+            raise CommandError(f'{opts["path"]} is not a directory')
+        pattern = os.path.join(opts['path'], '**' if opts['recursive'] else '', '*')
+        paths = sorted(p for p in glob.glob(pattern, recursive=opts['recursive'])
+                       if os.path.isfile(p) and p.lower().endswith(('.csv', '.zip')))
+        if not paths:
+            raise CommandError(f'no .csv or .zip files in {opts["path"]}')
+
+        def sources():
+            for p in paths:
+                with open(p, 'rb') as f:
+                    yield from batch.expand(os.path.basename(p), f)
+        try:
+            report = batch.ingest(sources(), workers=opts['workers'] or None)
+        except batch.BatchError as e:
+            raise CommandError(str(e))
+        for job in report['jobs']:
+            if job.phase == 'done':
+                self.stdout.write(f'{job.name}: {job.rows} rows, dataset {job.dataset_id}')
+            else:
+                self.stderr.write(f'{job.name}: {job.error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{report["files"] - report["failed"]}/{report["files"]} files, {report["bytes"] / 2**20:.1f} MB '
+            f'in {report["seconds"]:.1f}s ({report["mb_per_s"]} MB/s, {report["workers"]} parser processes)'))
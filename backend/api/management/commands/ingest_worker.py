@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from api.models import IngestJob
+from api import jobs
+
+class Command(BaseCommand):
+    help = 'Run queued ingest jobs from the database (use with INGEST_WORKERS=0)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='drain the queue and exit')
+        parser.add_argument('--poll', type=float, default=1.0, help='seconds between queue polls')
+
+    def handle(self, *args, **opts):
+        while True:
+            jobs.recover()
+            pending = list(IngestJob.objects.filter(phase='queued').order_by('created').values_list('pk', flat=True))
+            for pk in pending:
+                if jobs.claim(pk):
+                    job = IngestJob.objects.get(pk=pk)
+                    jobs.run(job)
+                    self.stdout.write(f'job {pk}: {job.phase}')
+            if opts['once'] and not pending:
+                return
+            if not pending:
+                time.sleep(opts['poll'])
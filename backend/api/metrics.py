@@ -0,0 +1,131 @@
+"""In-process metrics, served at /api/metrics in Prometheus text format.
+
+``span(name)`` times a step (CSV parse, stats, serialization, DB). Its
+duration goes into the ``api_span_seconds`` histogram and, inside a
+request, into that response's ``Server-Timing`` header. ``inc()`` adds to
+a counter, ``gauge()`` sets a value, and ``cache()`` counts a hit or a miss
+for a named cache.
+
+Everything is per process, so each worker reports its own numbers.
+"""
+import threading, time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+HELP = {
+    'api_request_seconds': ('histogram', 'Request latency by route'),
+    'api_span_seconds': ('histogram', 'Time spent in instrumented steps'),
+    'api_responses_total': ('counter', 'Responses by route and status'),
+    'api_request_bytes_total': ('counter', 'Request body bytes received'),
+    'api_response_bytes_total': ('counter', 'Response body bytes sent, after compression'),
+    'api_read_bytes_total': ('counter', 'Bytes read from stored files'),
+    'api_cache_requests_total': ('counter', 'Cache lookups by result'),
+    'api_cache_hit_ratio': ('gauge', 'Hits over lookups since the process started'),
+    'api_frame_cache_bytes': ('gauge', 'Memory held by the dataset frame cache'),
+    'api_frame_cache_entries': ('gauge', 'Datasets held by the dataset frame cache'),
+    'api_frame_cache_evictions_total': ('counter', 'Frames evicted to stay within the memory budget'),
+}
+
+_lock = threading.Lock()
+# (name, labels) -> [count per bucket..., count above the last, sum]
+_histograms = {}
+_counters = {}
+_gauges = {}
+# (name, seconds) of the spans run by the current request; None outside one
+_spans = ContextVar('spans', default=None)
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        h[bisect_left(BUCKETS, seconds)] += 1
+        h[-1] += seconds
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+def cache(name, hit):
+    inc('api_cache_requests_total', cache=name, result='hit' if hit else 'miss')
+
+@contextmanager
+def span(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        observe('api_span_seconds', elapsed, span=name)
+        spans = _spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+@contextmanager
+def collect():
+    """Gather the spans run inside the block into the yielded list."""
+    spans = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+def server_timing(spans, total):
+    """``Server-Timing`` value: each span name's summed duration, then the total."""
+    summed = {}
+    for name, seconds in spans:
+        summed[name] = summed.get(name, 0.0) + seconds
+    summed['total'] = total
+    return ', '.join(f'{name};dur={seconds * 1000:.2f}' for name, seconds in summed.items())
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ''
+    esc = lambda v: v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{esc(v)}"' for k, v in pairs) + '}'
+
+def render():
+    with _lock:
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+    lookups = {}
+    for (name, labels), v in counters.items():
+        if name == 'api_cache_requests_total':
+            d = dict(labels)
+            hits, total = lookups.get(d['cache'], (0, 0))
+            lookups[d['cache']] = (hits + (v if d['result'] == 'hit' else 0), total + v)
+    gauges.update({('api_cache_hit_ratio', (('cache', c),)): hits / total for c, (hits, total) in lookups.items()})
+
+    lines, seen = [], set()
+    def header(name):
+        if name not in seen:
+            seen.add(name)
+            kind, text = HELP.get(name, ('untyped', name))
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+    for (name, labels), h in sorted(histograms.items()):
+        header(name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ('+Inf',), h[:-1]):
+            cumulative += n
+            lines.append(f'{name}_bucket{_labels(labels, [("le", str(bound))])} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {h[-1]:.6f}')
+        lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    for (name, labels), v in sorted(counters.items()) + sorted(gauges.items()):
+        header(name)
+        lines.append(f'{name}{_labels(labels)} {v:g}' if isinstance(v, float) else f'{name}{_labels(labels)} {v}')
+    return '\n'.join(lines) + '\n'
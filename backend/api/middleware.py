@@ -0,0 +1,104 @@
+import cProfile, logging, os, re, time, uuid
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from . import metrics
+
+try:
+    import brotli
+except ImportError:  # optional; responses are gzipped without it
+    brotli = None
+
+accepts_br = re.compile(r'\bbr\b')
+log = logging.getLogger(__name__)
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware, but brotli when the client accepts ``br`` and the package is installed.
+
+    Streamed bodies (file downloads) pass through untouched: compressing
+    them on the fly costs CPU on every request and drops Content-Length.
+    """
+    def process_response(self, request, response):
+        if response.streaming:
+            return response
+        if (brotli is None or response.has_header('Content-Encoding')
+                or not accepts_br.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))):
+            return super().process_response(request, response)
+        if len(response.content) < 200:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=5)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = 'br'
+        # the body is no longer byte-identical; weaken a strong ETag like GZipMiddleware does
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+def _timed_query(execute, sql, params, many, context):
+    with metrics.span('db'):
+        return execute(sql, params, many, context)
+
+class MetricsMiddleware:
+    """Per-route latency, status and byte counts, plus a ``Server-Timing`` header.
+
+    With ``METRICS_PROFILE`` on, a request sent with ``X-Profile: 1`` runs
+    under cProfile; the stats go to ``PROFILE_DIR`` and the file name comes
+    back in ``X-Profile-File`` (open it with ``python -m pstats``).
+
+    Under ASGI it runs async, so async views are not pushed through
+    Django's single sync thread. There, queries run on worker threads and
+    are not timed, and profiling is not available.
+    """
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profiler = cProfile.Profile() if settings.METRICS_PROFILE and request.headers.get('X-Profile') else None
+        started = time.perf_counter()
+        with metrics.collect() as spans, connection.execute_wrapper(_timed_query):
+            response = profiler.runcall(self.get_response, request) if profiler else self.get_response(request)
+        return self.record(request, response, spans, time.perf_counter() - started, profiler)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with metrics.collect() as spans:
+            response = await self.get_response(request)
+        return self.record(request, response, spans, time.perf_counter() - started)
+
+    def record(self, request, response, spans, elapsed, profiler=None):
+        match = request.resolver_match
+        # the URL pattern, not the path, so ids don't multiply the series
+        route = '/' + match.route if match else 'unmatched'
+        metrics.observe('api_request_seconds', elapsed, route=route, method=request.method)
+        metrics.inc('api_responses_total', route=route, method=request.method, status=response.status_code)
+        received = int(request.META.get('CONTENT_LENGTH') or 0)
+        if received:
+            metrics.inc('api_request_bytes_total', received, route=route)
+        # streamed bodies (downloads) are counted by their Content-Length when they have one
+        sent = int(response.get('Content-Length') or 0) if response.streaming else len(response.content)
+        metrics.inc('api_response_bytes_total', sent, route=route)
+        response['Server-Timing'] = metrics.server_timing(spans, elapsed)
+        if profiler:
+            response['X-Profile-File'] = self.dump(profiler, route)
+        return response
+
+    def dump(self, profiler, route):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r'\W+', '_', route).strip('_') or 'root'
+        name = f'{slug}-{uuid.uuid4().hex[:8]}.prof'
+        profiler.dump_stats(os.path.join(settings.PROFILE_DIR, name))
+        log.info('profile written to %s', name)
+        return name
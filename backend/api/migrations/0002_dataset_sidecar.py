@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='sidecar',
+            field=models.FileField(blank=True, upload_to='datasets/'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_dataset_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('blob', models.CharField(max_length=255)),
+                ('checksum', models.CharField(max_length=128)),
+                ('phase', models.CharField(choices=[('queued', 'queued'), ('parsing', 'parsing'), ('summarizing', 'summarizing'), ('pruning', 'pruning'), ('done', 'done'), ('failed', 'failed')], default='queued', max_length=16)),
+                ('bytes_total', models.BigIntegerField(default=0)),
+                ('bytes_processed', models.BigIntegerField(default=0)),
+                ('rows', models.BigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('dataset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.dataset')),
+            ],
+        ),
+    ]
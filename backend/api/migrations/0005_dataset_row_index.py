@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_ingest_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='row_index',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
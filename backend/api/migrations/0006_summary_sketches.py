@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_dataset_row_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetsummary',
+            name='sketches',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
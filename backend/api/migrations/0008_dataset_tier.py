@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='tier',
+            field=models.CharField(choices=[('hot', 'hot'), ('cold', 'cold')], default='hot', max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['upload_time'], name='dataset_upload_time'),
+        ),
+    ]
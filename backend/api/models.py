@@ -5,4 +5,59 @@ class Dataset(models.Model):
     file = models.FileField(upload_to='datasets/')
     row_count = models.IntegerField(default=0)
     checksum = models.CharField(max_length=128, blank=True)
+    sidecar = models.FileField(upload_to='datasets/', blank=True)
+    # first row number of each sidecar record batch
+    row_index = models.JSONField(default=list, blank=True)
+    # 'cold': gzipped CSV and zstd-compressed sidecar (see retention.compress_cold)
+    tier = models.CharField(max_length=8, default='hot', choices=[('hot', 'hot'), ('cold', 'cold')])
+    class Meta:
+        indexes = [models.Index(fields=['upload_time'], name='dataset_upload_time')]
     def __str__(self): return f"{self.name} ({self.upload_time})"
+
+class DatasetSummary(models.Model):
+    # keyed by content so identical uploads share one row
+    checksum = models.CharField(max_length=128, unique=True)
+    stats = models.JSONField(default=dict)
+    # serialized SketchSet backing ?mode=approx
+    sketches = models.JSONField(default=dict, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+    def __str__(self): return f"summary {self.checksum[:12]}"
+
+class IngestJob(models.Model):
+    PHASES = ['queued', 'parsing', 'summarizing', 'pruning', 'done', 'failed']
+    name = models.CharField(max_length=255)
+    blob = models.CharField(max_length=255)
+    checksum = models.CharField(max_length=128)
+    phase = models.CharField(max_length=16, default='queued', choices=[(p, p) for p in PHASES])
+    bytes_total = models.BigIntegerField(default=0)
+    bytes_processed = models.BigIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # claims so far; a job whose worker died is requeued until this reaches INGEST_MAX_ATTEMPTS
+    attempts = models.PositiveSmallIntegerField(default=0)
+    dataset = models.ForeignKey(Dataset, null=True, blank=True, on_delete=models.SET_NULL)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    def __str__(self): return f"job {self.pk} {self.name} [{self.phase}]"
+
+class UploadSession(models.Model):
+    """A chunked upload being assembled in ``part`` (a preallocated file under the blob dir)."""
+    name = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    part = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    @property
+    def chunk_count(self): return max(1, -(-self.size // self.chunk_size))
+    def chunk_length(self, index):
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+    def __str__(self): return f"upload {self.pk} {self.name}"
+
+class UploadChunk(models.Model):
+    # one row per verified chunk; parallel PUTs insert independently
+    session = models.ForeignKey(UploadSession, related_name='chunks', on_delete=models.CASCADE)
+    index = models.IntegerField()
+    sha256 = models.CharField(max_length=64)
+    class Meta:
+        unique_together = [('session', 'index')]
@@ -0,0 +1,124 @@
+import logging, time
+import numpy as np
+import pandas as pd
+from . import columnar, framecache
+
+log = logging.getLogger(__name__)
+
+OPS = {
+    '==': lambda s, v: s == v,
+    '!=': lambda s, v: s != v,
+    '<': lambda s, v: s < v,
+    '<=': lambda s, v: s <= v,
+    '>': lambda s, v: s > v,
+    '>=': lambda s, v: s >= v,
+    'in': lambda s, v: s.isin(v),
+    'not in': lambda s, v: ~s.isin(v),
+}
+AGGS = ['count', 'sum', 'mean', 'median', 'min', 'max', 'std', 'nunique']
+MAX_LIMIT = 100000
+
+class QueryError(ValueError):
+    pass
+
+def _list(v):
+    return v if isinstance(v, list) else [v]
+
+def _names(spec, key):
+    """``spec[key]`` as a list of strings: one string or a list of them."""
+    values = _list(spec.get(key) or [])
+    if not all(isinstance(v, str) for v in values):
+        raise QueryError(f'{key} must be a column name or a list of them')
+    return values
+
+def parse(spec, names):
+    """Validate a query spec against the dataset's columns; returns a normalized copy."""
+    if not isinstance(spec, dict):
+        raise QueryError('query must be a JSON object')
+    def check(col):
+        if not isinstance(col, str) or col not in names:
+            raise QueryError(f'unknown column: {col}')
+        return col
+    filters = []
+    if not isinstance(spec.get('filter') or [], (dict, list)):
+        raise QueryError('filter must be an object or a list of them')
+    for f in _list(spec.get('filter') or []):
+        if not isinstance(f, dict) or f.get('op', '==') not in OPS:
+            raise QueryError(f'bad filter {f!r}; ops are {", ".join(OPS)}')
+        value = f.get('value')
+        if f.get('op', '==') in ('in', 'not in') and not isinstance(value, list):
+            raise QueryError(f"'{f['op']}' needs a list value")
+        filters.append((check(f.get('column')), f.get('op', '=='), value))
+    group_by = [check(c) for c in _names(spec, 'group_by')]
+    if not isinstance(spec.get('aggregates') or {}, dict):
+        raise QueryError('aggregates must be an object of column: function(s)')
+    aggregates = []
+    for col, funcs in (spec.get('aggregates') or {}).items():
+        for fn in _list(funcs):
+            if not isinstance(fn, str) or fn not in AGGS:
+                raise QueryError(f'unknown aggregate {fn!r}; use one of {", ".join(AGGS)}')
+            aggregates.append((check(col), fn))
+    if group_by and not aggregates:
+        aggregates = [(group_by[0], 'count')]
+    sort = []
+    for key in _names(spec, 'sort'):
+        sort.append((key.lstrip('-'), not key.startswith('-')))
+    columns = [check(c) for c in _names(spec, 'columns')] or None
+    try:
+        limit = min(int(spec.get('limit', 1000)), MAX_LIMIT)
+    except (TypeError, ValueError):
+        raise QueryError('limit must be an integer')
+    if limit < 0:
+        raise QueryError('limit must be at least 0')
+    return {'filters': filters, 'group_by': group_by, 'aggregates': aggregates,
+            'sort': sort, 'columns': columns, 'limit': limit}
+
+def _needed(q, names):
+    if not q['aggregates'] and not q['columns']:
+        return None
+    cols = {c for c, _, _ in q['filters']} | set(q['group_by']) | {c for c, _ in q['aggregates']}
+    cols |= set(q['columns'] or []) | {k for k, _ in q['sort'] if k in names}
+    return [c for c in names if c in cols]
+
+def execute(df, q):
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, value in q['filters']:
+        try:
+            mask &= OPS[op](df[col], value).to_numpy(dtype=bool, na_value=False)
+        except TypeError as e:
+            raise QueryError(f'cannot compare {col} {op} {value!r}: {e}')
+    df = df[mask]
+    matched = len(df)
+    if q['aggregates']:
+        named = {f'{col}_{fn}': pd.NamedAgg(column=col, aggfunc=fn) for col, fn in q['aggregates']}
+        # aggregate in float64 even where the cached frame holds float32
+        df = framecache.widen(df, categories=False)
+        try:
+            if q['group_by']:
+                out = df.groupby(q['group_by'], observed=True, sort=False).agg(**named).reset_index()
+            else:
+                out = pd.DataFrame({k: [df[a.column].agg(a.aggfunc)] for k, a in named.items()})
+        except TypeError as e:
+            raise QueryError(f'cannot aggregate: {e}')
+    else:
+        out = df[q['columns']] if q['columns'] else df
+    for key, _ in q['sort']:
+        if key not in out.columns:
+            raise QueryError(f'cannot sort by {key}; result columns are {", ".join(map(str, out.columns))}')
+    if q['sort']:
+        out = out.sort_values([k for k, _ in q['sort']], ascending=[a for _, a in q['sort']], kind='stable')
+    return out.head(q['limit']), matched
+
+def run_query(ds, spec):
+    started = time.perf_counter()
+    names = columnar.column_names(ds)
+    q = parse(spec, names)
+    needed = _needed(q, names)
+    df = framecache.get(ds, columns=needed)
+    if needed is not None:
+        df = df[needed]
+    out, matched = execute(df, q)
+    elapsed = (time.perf_counter() - started) * 1000
+    log.info('query dataset=%s rows=%s matched=%s returned=%s %.1fms', ds.pk, len(df), matched, len(out), elapsed)
+    # the negotiated renderer lays the frame out (see renderers.py)
+    return {'frame': out.reset_index(drop=True), 'matched': matched, 'elapsed_ms': round(elapsed, 3)}
@@ -0,0 +1,90 @@
+"""Renderers for tabular responses (dataset rows and query results).
+
+Views return the result DataFrame under ``data['frame']`` next to plain
+metadata (``total``, ``matched``...). The renderer picked by content
+negotiation (``Accept`` header or ``?format=``) lays it out:
+
+- ``json``: the original layout. The rows view sends records; the query
+  view sends ``columns`` plus row lists (the view's ``json_layout``).
+- ``columnar``: JSON with the column names once and one array per
+  column. NaN becomes null.
+- ``arrow``: an Arrow IPC stream. The metadata is stored as JSON under
+  the schema's ``meta`` key.
+
+Tabular bodies carry ``X-Encoded-Bytes`` (before any compression) and
+``X-Encode-Ms``.
+"""
+import json, time
+import pandas as pd
+import pyarrow as pa
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from . import metrics
+
+def plain_columns(frame):
+    """One list per column with NaN/NaT as None and numpy scalars as Python ones."""
+    return [frame[c].astype(object).where(frame[c].notna(), None).tolist() for c in frame.columns]
+
+def _split(data):
+    if isinstance(data, dict) and isinstance(data.get('frame'), pd.DataFrame):
+        return data['frame'], {k: v for k, v in data.items() if k != 'frame'}
+    return None, data
+
+class _Timed:
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        started = time.perf_counter()
+        frame, meta = _split(data)
+        with metrics.span('serialize'):
+            body = self.encode(frame, meta, renderer_context or {}) if frame is not None else \
+                JSONRenderer.render(self, data, accepted_media_type, renderer_context)
+        response = (renderer_context or {}).get('response')
+        if response is not None and frame is not None:
+            response['X-Encoded-Bytes'] = str(len(body))
+            response['X-Encode-Ms'] = f'{(time.perf_counter() - started) * 1000:.3f}'
+        return body
+
+class TableJSONRenderer(_Timed, JSONRenderer):
+    def encode(self, frame, meta, context):
+        layout = getattr(context.get('view'), 'json_layout', 'records')
+        if layout == 'records':
+            out = {'rows': frame.fillna('').to_dict(orient='records'), **meta}
+        else:
+            out = {'columns': [str(c) for c in frame.columns],
+                   'rows': frame.astype(object).where(frame.notna(), None).values.tolist(), **meta}
+        return JSONRenderer.render(self, out, None, context)
+
+class ColumnarJSONRenderer(_Timed, JSONRenderer):
+    media_type = 'application/vnd.columnar+json'
+    format = 'columnar'
+    def encode(self, frame, meta, context):
+        out = {'columns': [str(c) for c in frame.columns], 'data': plain_columns(frame), **meta}
+        return JSONRenderer.render(self, out, None, context)
+
+class ArrowRenderer(_Timed, BaseRenderer):
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+    def encode(self, frame, meta, context):
+        frame = frame.rename(columns=str)
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # mixed-type object columns: ship those as strings
+            mixed = [c for c in frame.columns if frame[c].dtype == object]
+            table = pa.Table.from_pandas(frame.astype({c: str for c in mixed}), preserve_index=False)
+        table = table.replace_schema_metadata({'meta': json.dumps(meta, default=str)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        frame, _ = _split(data)
+        if frame is None:
+            # errors have no table; answer them as JSON
+            response = (renderer_context or {}).get('response')
+            if response is not None:
+                response['Content-Type'] = 'application/json'
+            return JSONRenderer().render(data, accepted_media_type, renderer_context)
+        return super().render(data, accepted_media_type, renderer_context)
+
+TABLE_RENDERERS = [TableJSONRenderer, ColumnarJSONRenderer, ArrowRenderer]
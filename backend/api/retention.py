@@ -0,0 +1,124 @@
+"""Retention and storage tiering for datasets.
+
+``prune()`` deletes what falls outside the policy in one transaction.
+The policy has three independent limits, and 0 turns any of them off:
+
+- ``RETENTION_MAX_DATASETS``: newest N datasets
+- ``RETENTION_MAX_AGE_DAYS``: uploaded within the last N days
+- ``RETENTION_MAX_BYTES``: newest datasets whose stored files fit in N
+  bytes. Shared blobs count once.
+
+``compress_cold()`` moves stored files to the cold tier once every dataset
+using them is older than ``RETENTION_COLD_AFTER_DAYS``. The CSV is
+gzipped, and pandas and ``storage.open_csv`` read it as is. The sidecar
+is rewritten with zstd-compressed record batches, which Arrow decompresses
+batch by batch on read, so the row index still applies.
+"""
+import gzip, logging, os, shutil, uuid
+from datetime import timedelta
+import pyarrow as pa
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from .models import Dataset, IngestJob
+from . import framecache, stats, storage
+
+log = logging.getLogger(__name__)
+
+def _size(name, sizes):
+    if name not in sizes:
+        try:
+            sizes[name] = os.path.getsize(storage.path(name)) if name else 0
+        except OSError:
+            sizes[name] = 0
+    return sizes[name]
+
+def expired(now=None):
+    """Ids of the datasets outside the retention policy."""
+    now = now or timezone.now()
+    drop = set()
+    newest = Dataset.objects.order_by('-upload_time', '-pk')
+    if settings.RETENTION_MAX_DATASETS:
+        drop.update(newest.values_list('pk', flat=True)[settings.RETENTION_MAX_DATASETS:])
+    if settings.RETENTION_MAX_AGE_DAYS:
+        cutoff = now - timedelta(days=settings.RETENTION_MAX_AGE_DAYS)
+        drop.update(Dataset.objects.filter(upload_time__lt=cutoff).values_list('pk', flat=True))
+    if settings.RETENTION_MAX_BYTES:
+        used, sizes, seen = 0, {}, set()
+        for pk, file, sidecar in newest.exclude(pk__in=drop).values_list('pk', 'file', 'sidecar').iterator():
+            new = {file, sidecar} - seen
+            extra = sum(_size(n, sizes) for n in new)
+            if used + extra > settings.RETENTION_MAX_BYTES:
+                drop.add(pk)
+                continue
+            used += extra
+            seen |= new
+    return drop
+
+def prune(now=None):
+    """Delete expired datasets, their summaries and, once unreferenced, their files."""
+    ids = expired(now)
+    if not ids:
+        return 0
+    with transaction.atomic():
+        victims = list(Dataset.objects.filter(pk__in=ids).only('pk', 'checksum', 'file', 'sidecar'))
+        Dataset.objects.filter(pk__in=ids).delete()
+        stats.prune_orphans()
+    framecache.invalidate([(ds.pk, ds.checksum) for ds in victims])
+    storage.release(storage.files_of(victims))
+    return len(victims)
+
+def _gzip(name):
+    out = name + '.gz'
+    tmp = f'{storage.path(out)}.{uuid.uuid4().hex}.tmp'
+    with storage.open_csv(name) as src, gzip.open(tmp, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp, storage.path(out))
+    return out
+
+def _compress_sidecar(name):
+    codec = next((c for c in ('zstd', 'lz4') if pa.Codec.is_available(c)), None)
+    if not name or codec is None or not os.path.exists(storage.path(name)):
+        return
+    tmp = f'{storage.path(name)}.{uuid.uuid4().hex}.tmp'
+    with pa.memory_map(storage.path(name), 'r') as src:
+        reader = pa.ipc.open_file(src)
+        # same batches in the same order, so the dataset's row index stays valid
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(
+                sink, reader.schema, options=pa.ipc.IpcWriteOptions(compression=codec)) as writer:
+            for i in range(reader.num_record_batches):
+                writer.write_batch(reader.get_batch(i))
+    os.replace(tmp, storage.path(name))
+
+def compress_cold(now=None, limit=None):
+    """Compress the files of datasets past ``RETENTION_COLD_AFTER_DAYS``; returns how many files."""
+    if not settings.RETENTION_COLD_AFTER_DAYS:
+        return 0
+    cutoff = (now or timezone.now()) - timedelta(days=settings.RETENTION_COLD_AFTER_DAYS)
+    # a blob goes cold only when its newest dataset is old enough
+    files = (Dataset.objects.values('file')
+             .annotate(newest=Max('upload_time'), hot=Count('pk', filter=Q(tier='hot')))
+             .filter(newest__lt=cutoff, hot__gt=0).order_by('newest'))
+    done = 0
+    for row in files[:limit] if limit else files:
+        name = row['file']
+        if IngestJob.objects.filter(blob=name).exclude(phase__in=['done', 'failed']).exists():
+            continue  # an upload of the same bytes is still being ingested
+        try:
+            sidecars = set(Dataset.objects.filter(file=name).exclude(sidecar='').values_list('sidecar', flat=True))
+            for sidecar in sidecars:
+                _compress_sidecar(sidecar)
+            cold = name if name.endswith('.gz') else _gzip(name)
+        except OSError as e:
+            log.warning('could not compress %s: %s', name, e)
+            continue
+        with transaction.atomic():
+            # jobs.run() copies a dedup's file name under its content's blob lock
+            for checksum in sorted(set(Dataset.objects.filter(file=name).values_list('checksum', flat=True)) - {''}):
+                storage.lock(storage.blob_name(checksum))
+            Dataset.objects.filter(file=name).update(file=cold, tier='cold')
+        if cold != name:
+            storage.release([name])
+        done += 1
+    return done
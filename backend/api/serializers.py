@@ -1,6 +1,22 @@
 from rest_framework import serializers
-from .models import Dataset
+from .models import Dataset, IngestJob, UploadSession
+from . import uploads
 class DatasetSerializer(serializers.ModelSerializer):
     class Meta:
         model = Dataset
         fields = ['id','name','upload_time','file','row_count','checksum']
+
+class IngestJobSerializer(serializers.ModelSerializer):
+    dataset = DatasetSerializer(read_only=True)
+    class Meta:
+        model = IngestJob
+        fields = ['id','name','phase','bytes_total','bytes_processed','rows','error','dataset','created','updated']
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_count = serializers.IntegerField(read_only=True)
+    received = serializers.SerializerMethodField()
+    class Meta:
+        model = UploadSession
+        fields = ['id','name','size','chunk_size','chunk_count','received','created','updated']
+    def get_received(self, obj):
+        return uploads.received(obj)
@@ -0,0 +1,220 @@
+import base64, math
+import numpy as np
+import pandas as pd
+
+class Moments:
+    """Mergeable count/mean/M2/min/max (Chan et al. parallel variance)."""
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        self.min, self.max = math.inf, -math.inf
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        other = Moments()
+        other.n = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min, other.max = float(values.min()), float(values.max())
+        self.merge(other)
+    def merge(self, other):
+        if not other.n:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+    def as_dict(self):
+        if not self.n:
+            return {'count': 0, 'mean': None, 'min': None, 'max': None, 'std': None}
+        std = math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else None
+        return {'count': self.n, 'mean': self.mean, 'min': self.min, 'max': self.max, 'std': std}
+    def to_dict(self):
+        return {'n': self.n, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min if self.n else None, 'max': self.max if self.n else None}
+    @classmethod
+    def from_dict(cls, d):
+        m = cls()
+        m.n, m.mean, m.m2 = d['n'], d['mean'], d['m2']
+        if m.n:
+            m.min, m.max = d['min'], d['max']
+        return m
+
+class KLL:
+    """Mergeable quantile sketch (Karnin-Lang-Liberty) with numpy compactors.
+
+    Items on level h stand for 2**h input values. ``rank_error`` is the
+    normalized rank error bound at ~99% confidence for the sketch's k.
+    """
+    C = 2 / 3
+
+    def __init__(self, k=200, levels=None, seed=None):
+        self.k = k
+        self.levels = [np.asarray(l, dtype='float64') for l in levels] if levels else [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self):
+        return 2.296 / self.k ** 0.9723
+
+    @property
+    def n(self):
+        return int(sum(len(l) << h for h, l in enumerate(self.levels)))
+
+    def _capacity(self, h):
+        depth = len(self.levels) - 1 - h
+        return max(int(math.ceil(self.k * self.C ** depth)), 2)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                keep = level[-1:] if len(level) % 2 else level[:0]
+                pairs = level[:len(level) - len(keep)]
+                promoted = pairs[self.rng.integers(2)::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                h = 0  # capacities shift when a level is added
+                continue
+            h += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, l in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], l])
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        items = np.concatenate(self.levels)
+        if not len(items):
+            return [None for _ in qs]
+        weights = np.concatenate([np.full(len(l), 1 << h, dtype='int64') for h, l in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side='left')
+        return [float(items[min(i, len(items) - 1)]) for i in idx]
+
+    def to_dict(self):
+        return {'k': self.k, 'levels': [l.tolist() for l in self.levels]}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['k'], d['levels'])
+
+class HyperLogLog:
+    """Distinct-count sketch over 2**p registers; relative std error is 1.04/sqrt(2**p)."""
+    def __init__(self, p=12, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else np.zeros(self.m, dtype='uint8')
+
+    @property
+    def rel_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def update(self, values):
+        # dedupe before the str conversion, so a low-cardinality column converts a handful of values
+        values = pd.unique(pd.Series(pd.unique(values)).dropna().astype(str).to_numpy())
+        if not len(values):
+            return self
+        h = pd.util.hash_array(values, categorize=False).astype('uint64')
+        idx = (h >> np.uint64(64 - self.p)).astype('int64')
+        rest_bits = 64 - self.p
+        rest = h & np.uint64((1 << rest_bits) - 1)
+        # bit length via frexp is exact: rest has at most 52 bits
+        bitlen = np.frexp(rest.astype('float64'))[1]
+        rank = (rest_bits - bitlen + 1).astype('uint8')
+        np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        est = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype('int64')))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if est <= 2.5 * m and zeros:
+            est = m * math.log(m / zeros)
+        return int(round(est))
+
+    def to_dict(self):
+        return {'p': self.p, 'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['p'], np.frombuffer(base64.b64decode(d['registers']), dtype='uint8').copy())
+
+class SketchSet:
+    """Per-column sketches for one dataset: moments and KLL for numeric columns, HLL for the rest.
+
+    A text column whose values are mostly distinct within a chunk (names,
+    free-text notes) is an identifier: it gets no HLL, and later chunks
+    skip it, since its distinct count is just about the row count.
+    """
+    # a chunk of at least IDENTIFIER_MIN_ROWS values, more than this share distinct
+    IDENTIFIER_RATIO = 0.5
+    IDENTIFIER_MIN_ROWS = 1000
+
+    def __init__(self):
+        self.moments, self.quantiles, self.distinct = {}, {}, {}
+        self.identifiers = set()
+
+    def update(self, chunk):
+        for col in chunk.select_dtypes(include='number').columns:
+            values = chunk[col].to_numpy(dtype='float64')
+            self.moments.setdefault(col, Moments()).update(values)
+            self.quantiles.setdefault(col, KLL()).update(values)
+        for col in chunk.select_dtypes(exclude='number').columns:
+            if col in self.identifiers:
+                continue
+            values = chunk[col].dropna().to_numpy()
+            if len(values) >= self.IDENTIFIER_MIN_ROWS:
+                unique = pd.unique(values)
+                if len(unique) > self.IDENTIFIER_RATIO * len(values):
+                    self.identifiers.add(col)
+                    self.distinct.pop(col, None)
+                    continue
+                values = unique
+            self.distinct.setdefault(col, HyperLogLog()).update(values)
+        return self
+
+    def restrict(self, numeric_columns):
+        self.moments = {c: self.moments[c] for c in numeric_columns if c in self.moments}
+        self.quantiles = {c: self.quantiles[c] for c in numeric_columns if c in self.quantiles}
+        self.distinct = {c: h for c, h in self.distinct.items() if c not in numeric_columns}
+        self.identifiers -= set(numeric_columns)
+
+    def to_dict(self):
+        return {'moments': {c: m.to_dict() for c, m in self.moments.items()},
+                'quantiles': {c: q.to_dict() for c, q in self.quantiles.items()},
+                'distinct': {c: h.to_dict() for c, h in self.distinct.items()},
+                'identifiers': sorted(self.identifiers)}
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls()
+        s.moments = {c: Moments.from_dict(v) for c, v in d.get('moments', {}).items()}
+        s.quantiles = {c: KLL.from_dict(v) for c, v in d.get('quantiles', {}).items()}
+        s.distinct = {c: HyperLogLog.from_dict(v) for c, v in d.get('distinct', {}).items()}
+        s.identifiers = set(d.get('identifiers', []))
+        return s
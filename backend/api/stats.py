@@ -0,0 +1,93 @@
+import math
+from .models import Dataset, DatasetSummary
+from . import columnar, framecache, metrics
+from .ingest import checksum_file
+from .sketches import SketchSet
+
+STATS = ['count', 'mean', 'median', 'min', 'max', 'std']
+
+def _clean(v):
+    v = float(v)
+    return None if math.isnan(v) else v
+
+def summarize(numeric):
+    """count/mean/median/min/max/std for every numeric column, one vectorized pass per stat."""
+    if numeric.shape[1] == 0:
+        return {}
+    table = numeric.agg(STATS)
+    stats = {}
+    for col in table.columns:
+        s = {k: _clean(table.at[k, col]) for k in STATS}
+        s['count'] = int(s['count'] or 0)
+        stats[col] = s
+    return stats
+
+def summarize_ingest(result, ds):
+    """Summary from the moments gathered while streaming; medians come from one column at a time."""
+    stats = {}
+    for col in result.numeric_columns:
+        s = result.stats[col].as_dict()
+        median = columnar.read_frame(ds, columns=[col])[col].median() if s['count'] else None
+        s['median'] = None if median is None else _clean(median)
+        stats[col] = {k: s[k] for k in STATS}
+    return stats
+
+def store_summary(checksum, stats, sketches=None):
+    defaults = {'stats': stats}
+    if sketches is not None:
+        defaults['sketches'] = sketches.to_dict()
+    obj, _ = DatasetSummary.objects.update_or_create(checksum=checksum, defaults=defaults)
+    return obj
+
+def build_sketches(ds):
+    """Sketches for a dataset ingested before they existed, one sidecar batch at a time."""
+    sketches = SketchSet()
+    for start in range(0, max(ds.row_count, 1), columnar.BATCH_ROWS):
+        sketches.update(columnar.read_frame(ds, start=start, stop=start + columnar.BATCH_ROWS))
+    sketches.restrict([c for c in sketches.moments if c not in sketches.distinct])
+    return sketches
+
+def approx_summary(sketches):
+    """Summary served from sketches, with the error bound of every figure."""
+    summary = {}
+    for col, m in sketches.moments.items():
+        s = m.as_dict()
+        kll = sketches.quantiles[col]
+        eps = kll.rank_error
+        median, lo, hi = kll.quantiles([0.5, max(0.5 - eps, 0), min(0.5 + eps, 1)])
+        s['median'] = median
+        s['median_bounds'] = [lo, hi] if median is not None else None
+        summary[col] = {k: s[k] for k in STATS + ['median_bounds']}
+    distinct = {col: h.estimate() for col, h in sketches.distinct.items()}
+    any_kll = next(iter(sketches.quantiles.values()), None)
+    any_hll = next(iter(sketches.distinct.values()), None)
+    error = {
+        'count': 0, 'mean': 0, 'min': 0, 'max': 0, 'std': 0,
+        'median': {'normalized_rank_error': any_kll.rank_error if any_kll else None, 'confidence': 0.99},
+        'distinct': {'relative_std_error': any_hll.rel_error if any_hll else None},
+    }
+    # mostly-unique text columns get no distinct count; they are listed instead
+    return {'summary': summary, 'distinct': distinct, 'identifiers': sorted(sketches.identifiers), 'error': error}
+
+def get_summary_obj(ds):
+    return DatasetSummary.objects.filter(checksum=ds.checksum).first() if ds.checksum else None
+
+def summary_for(ds):
+    """Stored summary row for ``ds``, computed once and persisted if it predates stored summaries."""
+    if not ds.checksum:
+        ds.checksum = checksum_file(ds.file.path)
+        ds.save(update_fields=['checksum'])
+    obj = get_summary_obj(ds)
+    metrics.cache('summary', obj is not None)
+    if obj is None:
+        numeric = framecache.widen(framecache.get(ds).select_dtypes(include='number'))
+        with metrics.span('stats'):
+            obj = store_summary(ds.checksum, summarize(numeric))
+    return obj
+
+def get_summary(ds):
+    obj = get_summary_obj(ds)
+    return obj.stats if obj else None
+
+def prune_orphans():
+    DatasetSummary.objects.exclude(checksum__in=Dataset.objects.values('checksum')).delete()
@@ -0,0 +1,84 @@
+import gzip, hashlib, os, uuid
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from .models import Dataset, IngestJob
+
+BLOB_DIR = 'datasets'
+
+def blob_name(checksum):
+    return f'{BLOB_DIR}/{checksum}.csv'
+
+def lock(name):
+    """Serialize placing and releasing blob ``name`` for the rest of the transaction.
+
+    SQLite queues write transactions already (IMMEDIATE, see settings);
+    PostgreSQL takes an advisory lock on the name.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as c:
+            c.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [name])
+
+def place(tmp, checksum, claim):
+    """Move ``tmp`` to its content address, or drop it if that blob exists; returns ``claim``'s result.
+
+    ``claim(blob, checksum, size)`` must create the row that refers to the
+    blob (an IngestJob). It runs in the same locked transaction as the
+    existence check, so a concurrent ``release()`` cannot delete the blob
+    between the dedup and the reference.
+    """
+    name = blob_name(checksum)
+    with transaction.atomic():
+        lock(name)
+        ref = claim(name, checksum, os.path.getsize(tmp))
+        if default_storage.exists(name):
+            os.remove(tmp)
+        else:
+            os.replace(tmp, default_storage.path(name))
+    return ref
+
+def store_upload(file_obj, claim):
+    """Write an upload into the content-addressed store, hashing while it is copied; see ``place``."""
+    os.makedirs(default_storage.path(BLOB_DIR), exist_ok=True)
+    tmp = default_storage.path(f'{BLOB_DIR}/.upload-{uuid.uuid4().hex}')
+    h = hashlib.sha256()
+    try:
+        with open(tmp, 'wb') as out:
+            for chunk in file_obj.chunks():
+                h.update(chunk)
+                out.write(chunk)
+        return place(tmp, h.hexdigest(), claim)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def find_existing(checksum):
+    """Most recent dataset with this content whose blob is still on disk."""
+    for ds in Dataset.objects.filter(checksum=checksum).order_by('-upload_time'):
+        if ds.file and os.path.exists(ds.file.path):
+            return ds
+    return None
+
+def path(name):
+    return default_storage.path(name)
+
+def open_csv(name):
+    """The stored CSV as plain bytes, whether or not it has been gzipped (cold tier)."""
+    return gzip.open(path(name), 'rb') if name.endswith('.gz') else open(path(name), 'rb')
+
+def refcount(name):
+    pending = IngestJob.objects.filter(blob=name).exclude(phase__in=['done', 'failed']).count()
+    return pending + Dataset.objects.filter(Q(file=name) | Q(sidecar=name)).count()
+
+def release(names):
+    """Delete stored files that no dataset refers to any more."""
+    for name in set(names):
+        if not name:
+            continue
+        with transaction.atomic():
+            lock(name)
+            if not refcount(name) and default_storage.exists(name):
+                default_storage.delete(name)
+
+def files_of(datasets):
+    return [n for ds in datasets for n in (ds.file.name, ds.sidecar.name) if n]
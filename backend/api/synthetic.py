@@ -0,0 +1,53 @@
+"""Synthetic equipment data with the sample CSV's schema, for benchmarks and load tests."""
+import os
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Equipment ID', 'Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature', 'Material', 'Notes']
+TYPES = ['Pump', 'Heat Exchanger', 'Reactor', 'Valve', 'Compressor', 'Condenser', 'Column', 'Tank', 'Mixer', 'Filter']
+MATERIALS = ['CarbonSteel', 'StainlessSteel', 'Alloy', 'Brass', 'Titanium', 'Inconel', 'Hastelloy', 'Copper']
+NOTES = ['Startup pump', 'Shell & Tube', 'High temp', 'Spare capacity', 'Control valve', 'Inspected', 'Standby', 'Replaced seal']
+# columns that get blanked at ``nan_ratio``; the ID, name and type stay filled
+NULLABLE = ['Flowrate', 'Pressure', 'Temperature', 'Material', 'Notes']
+
+def labels(base, n):
+    """``n`` category labels: the base names, then numbered variants of them."""
+    return [base[i] if i < len(base) else f'{base[i % len(base)]}_{i // len(base)}' for i in range(n)]
+
+def frames(rows, nan_ratio=0.0, types=5, materials=5, chunk_rows=100_000, seed=0):
+    """Yield DataFrames of at most ``chunk_rows`` rows, ``rows`` in total."""
+    if not 0 <= nan_ratio < 1:
+        raise ValueError('nan_ratio must be in [0, 1)')
+    if types < 1 or materials < 1:
+        raise ValueError('types and materials must be at least 1')
+    rng = np.random.default_rng(seed)
+    type_names = np.asarray(labels(TYPES, types), dtype=object)
+    material_names = np.asarray(labels(MATERIALS, materials), dtype=object)
+    notes = np.asarray(NOTES, dtype=object)
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        ids = np.arange(start + 1, start + n + 1)
+        t = rng.integers(types, size=n)
+        # each type gets its own operating range so group-bys and comparisons have structure
+        df = pd.DataFrame({
+            'Equipment ID': ids,
+            'Equipment Name': pd.Series(type_names[t]).str.replace(' ', '') + '_' + pd.Series(ids).astype(str),
+            'Type': type_names[t],
+            'Flowrate': rng.gamma(2.0, 2.0 + t % 7, n).round(2),
+            'Pressure': rng.normal(2.5 + 0.4 * (t % 4), 0.4, n).round(2),
+            'Temperature': rng.normal(45.0 + 20.0 * (t % 8), 8.0, n).round(1),
+            'Material': material_names[rng.integers(materials, size=n)],
+            'Notes': notes[rng.integers(len(notes), size=n)],
+        })
+        if nan_ratio:
+            for col in NULLABLE:
+                df.loc[rng.random(n) < nan_ratio, col] = np.nan
+        yield df
+
+def write_csv(path, rows, **options):
+    """Write ``rows`` synthetic rows to ``path`` chunk by chunk; returns the file size."""
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(COLUMNS) + '\n')
+        for df in frames(rows, **options):
+            df.to_csv(f, header=False, index=False)
+    return os.path.getsize(path)
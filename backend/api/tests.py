@@ -0,0 +1,89 @@
+import hashlib, shutil, tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from .jobs import claim, run
+from .models import IngestJob, UploadSession
+from .query import parse, QueryError
+
+NAMES = ['Equipment ID', 'Type', 'Pressure']
+CSV = b'Equipment ID,Type,Pressure\n1,Pump,2.5\n2,Valve,3.1\n3,Pump,2.9\n'
+
+class QueryParseTests(SimpleTestCase):
+    def test_malformed_spec_raises_query_error(self):
+        for spec in [
+            {'aggregates': 'Pressure'},
+            {'aggregates': ['Pressure']},
+            {'aggregates': {'Pressure': [{'fn': 'mean'}]}},
+            {'filter': 'Pressure > 2'},
+            {'filter': [['Pressure', '>', 2]]},
+            {'group_by': {'column': 'Type'}},
+            {'group_by': [['Type']]},
+            {'sort': {'Pressure': 'desc'}},
+            {'sort': [1]},
+            {'columns': [{'name': 'Type'}]},
+            {'limit': 'ten'},
+            {'limit': -1},
+        ]:
+            with self.subTest(spec=spec), self.assertRaises(QueryError):
+                parse(spec, NAMES)
+
+    def test_valid_spec(self):
+        q = parse({'filter': {'column': 'Pressure', 'op': '>', 'value': 2}, 'group_by': 'Type',
+                   'aggregates': {'Pressure': ['mean', 'max']}, 'sort': '-Type', 'limit': 5}, NAMES)
+        self.assertEqual(q['group_by'], ['Type'])
+        self.assertEqual(q['aggregates'], [('Pressure', 'mean'), ('Pressure', 'max')])
+        self.assertEqual(q['sort'], [('Type', False)])
+
+class MediaTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp()
+        cls.overrides = override_settings(MEDIA_ROOT=cls.media, INGEST_WORKERS=0)
+        cls.overrides.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.overrides.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+class QueryViewTests(MediaTestCase):
+    def setUp(self):
+        job = self.client.post('/api/upload/', {'file': SimpleUploadedFile('eq.csv', CSV)}).json()
+        self.assertTrue(claim(job['id']))
+        run(IngestJob.objects.get(pk=job['id']))
+        self.url = f"/api/datasets/{IngestJob.objects.get(pk=job['id']).dataset_id}/query/"
+
+    def test_malformed_aggregates_is_400(self):
+        for body in [{'aggregates': 'Pressure'}, {'aggregates': ['Pressure']}, {'sort': {'Pressure': 1}}]:
+            with self.subTest(body=body):
+                r = self.client.post(self.url, body, content_type='application/json')
+                self.assertEqual(r.status_code, 400)
+                self.assertIn('error', r.json())
+
+    def test_group_by(self):
+        r = self.client.post(self.url, {'group_by': 'Type', 'aggregates': {'Pressure': 'max'}},
+                             content_type='application/json')
+        self.assertEqual(r.status_code, 200)
+
+class ChunkedUploadTests(MediaTestCase):
+    def put(self, sid, index, body, sha256=None):
+        return self.client.put(f'/api/uploads/{sid}/chunks/{index}/', body, content_type='application/octet-stream',
+                               HTTP_X_CHUNK_SHA256=sha256 or hashlib.sha256(body).hexdigest())
+
+    def test_bad_resend_keeps_accepted_chunk(self):
+        data = CSV * 30000
+        s = self.client.post('/api/uploads/', {'name': 'eq.csv', 'size': len(data), 'chunk_size': 2**20},
+                             content_type='application/json').json()
+        chunks = [data[i:i + 2**20] for i in range(0, len(data), 2**20)]
+        for i, chunk in enumerate(chunks):
+            self.assertEqual(self.put(s['id'], i, chunk).status_code, 200)
+        good = hashlib.sha256(chunks[0]).hexdigest()
+        self.assertEqual(self.put(s['id'], 0, b'x' * len(chunks[0]), good).status_code, 400)
+        with open(f"{self.media}/{UploadSession.objects.get(pk=s['id']).part}", 'rb') as f:
+            self.assertEqual(f.read(), data)
+        r = self.client.post(f"/api/uploads/{s['id']}/finalize/", {'sha256': hashlib.sha256(data).hexdigest()},
+                             content_type='application/json')
+        self.assertEqual(r.status_code, 202)
+        self.assertEqual(IngestJob.objects.get(pk=r.json()['id']).checksum, hashlib.sha256(data).hexdigest())
@@ -0,0 +1,139 @@
+"""Chunked, resumable uploads.
+
+A session preallocates a part file. Each PUT streams one numbered chunk to
+a temp file, hashing as it goes, and copies it to its offset only once
+its length and SHA-256 match what the client sent, so a bad re-send
+cannot clobber a chunk that was already accepted. `received` lists the
+accepted chunks so an interrupted client can resume. The whole-file
+checksum is built in order as chunks arrive (per process), and finalize
+only hashes whatever this process has not seen yet, unless a chunk was
+replaced after it was hashed or the client sent its own whole-file hash;
+then the assembled file is hashed again from disk.
+"""
+import hashlib, os, shutil, threading, uuid
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from .models import UploadSession, UploadChunk
+from . import storage
+
+BLOCK = 1024 * 1024
+
+class UploadError(ValueError):
+    pass
+
+class ChecksumError(UploadError):
+    pass
+
+# session pk -> [next chunk index, running sha256, lock, {index: digest read}]; in-process only
+_hashers = {}
+_lock = threading.Lock()
+
+def create(name, size, chunk_size=None):
+    if size < 0:
+        raise UploadError('size must be a non-negative byte count')
+    chunk_size = int(chunk_size or settings.UPLOAD_CHUNK_BYTES)
+    if not settings.UPLOAD_CHUNK_MIN <= chunk_size <= settings.UPLOAD_CHUNK_MAX:
+        raise UploadError(f'chunk_size must be between {settings.UPLOAD_CHUNK_MIN} and {settings.UPLOAD_CHUNK_MAX}')
+    os.makedirs(default_storage.path(storage.BLOB_DIR), exist_ok=True)
+    part = f'{storage.BLOB_DIR}/.upload-{uuid.uuid4().hex}'
+    with open(default_storage.path(part), 'wb') as f:
+        f.truncate(size)
+    return UploadSession.objects.create(name=name, size=size, chunk_size=chunk_size, part=part)
+
+def received(session):
+    return sorted(session.chunks.values_list('index', flat=True))
+
+def write_chunk(session, index, stream, sha256):
+    """Stage chunk ``index`` from ``stream`` and copy it into place only if its length and hash check out."""
+    if not 0 <= index < session.chunk_count:
+        raise UploadError(f'chunk index must be between 0 and {session.chunk_count - 1}')
+    expected = session.chunk_length(index)
+    tmp = storage.path(f'{session.part}.{index}.{uuid.uuid4().hex}')
+    try:
+        h = hashlib.sha256()
+        written = 0
+        with open(tmp, 'wb') as f:
+            while written < expected:
+                block = stream.read(min(BLOCK, expected - written))
+                if not block:
+                    break
+                h.update(block)
+                f.write(block)
+                written += len(block)
+            extra = stream.read(1)
+        if written != expected or extra:
+            raise UploadError(f'chunk {index} must be exactly {expected} bytes')
+        digest = h.hexdigest()
+        if sha256 and digest != sha256.lower():
+            raise UploadError(f'chunk {index} hash mismatch: got {digest}')
+        # the session row update serializes writers, so the part file and the
+        # recorded digest of a chunk PUT twice at once cannot disagree
+        with transaction.atomic():
+            UploadSession.objects.filter(pk=session.pk).update(updated=timezone.now())
+            with open(tmp, 'rb') as src, open(storage.path(session.part), 'r+b') as dst:
+                dst.seek(index * session.chunk_size)
+                shutil.copyfileobj(src, dst, BLOCK)
+            UploadChunk.objects.update_or_create(session=session, index=index, defaults={'sha256': digest})
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _advance(session)
+    return digest
+
+def _advance(session):
+    """Feed the running whole-file hash every contiguous chunk that has arrived.
+
+    The digest each chunk had when it was read is kept, so finalize can tell
+    whether one was replaced after the running hash had already passed it.
+    """
+    with _lock:
+        state = _hashers.setdefault(session.pk, [0, hashlib.sha256(), threading.Lock(), {}])
+    done = dict(session.chunks.values_list('index', 'sha256'))
+    with state[2], open(storage.path(session.part), 'rb') as f:
+        while state[0] in done:
+            f.seek(state[0] * session.chunk_size)
+            left = session.chunk_length(state[0])
+            while left:
+                block = f.read(min(BLOCK, left))
+                state[1].update(block)
+                left -= len(block)
+            state[3][state[0]] = done[state[0]]
+            state[0] += 1
+    return state
+
+def _hash_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(BLOCK):
+            h.update(block)
+    return h.hexdigest()
+
+def finalize(session, claim, sha256=None):
+    """Check every chunk is in (and the whole-file ``sha256``, if given), then ``storage.place`` the part file."""
+    missing = sorted(set(range(session.chunk_count)) - set(received(session)))
+    if missing:
+        raise UploadError(f'{len(missing)} chunks missing, first is {missing[0]}')
+    if sha256:
+        # a client checksum is checked against the bytes actually on disk
+        checksum = _hash_file(storage.path(session.part))
+    else:
+        # chunks that went to other processes (or before a restart) are hashed from disk here
+        state = _advance(session)
+        replaced = state[3] != dict(session.chunks.values_list('index', 'sha256'))
+        checksum = _hash_file(storage.path(session.part)) if replaced else state[1].hexdigest()
+    with _lock:
+        _hashers.pop(session.pk, None)
+    if sha256 and sha256.lower() != checksum:
+        raise ChecksumError(f'file hash mismatch: got {checksum}')
+    ref = storage.place(storage.path(session.part), checksum, claim)
+    session.delete()
+    return ref
+
+def abort(session):
+    with _lock:
+        _hashers.pop(session.pk, None)
+    if default_storage.exists(session.part):
+        default_storage.delete(session.part)
+    session.delete()
@@ -2,9 +2,19 @@ from django.urls import path
 from . import views
 urlpatterns = [
     path('upload/', views.UploadCSVView.as_view(), name='upload-csv'),
+    path('upload/batch/', views.BatchUploadView.as_view(), name='upload-batch'),
+    path('uploads/', views.UploadSessionCreateView.as_view(), name='upload-create'),
+    path('uploads/<int:pk>/', views.UploadSessionView.as_view(), name='upload-session'),
+    path('uploads/<int:pk>/chunks/<int:index>/', views.UploadChunkView.as_view(), name='upload-chunk'),
+    path('uploads/<int:pk>/finalize/', views.UploadFinalizeView.as_view(), name='upload-finalize'),
+    path('metrics', views.metrics_view, name='metrics'),
+    path('jobs/<int:pk>/', views.IngestJobView.as_view(), name='ingest-job'),
     path('datasets/', views.DatasetListView.as_view(), name='dataset-list'),
-    path('datasets/<int:pk>/rows/', views.DatasetRowsView.as_view(), name='dataset-rows'),
+    path('datasets/compare/', views.DatasetCompareView.as_view(), name='dataset-compare'),
+    path('datasets/<int:pk>/rows/', views.offload(views.DatasetRowsView.as_view()), name='dataset-rows'),
     path('datasets/<int:pk>/summary/', views.DatasetSummaryView.as_view(), name='dataset-summary'),
-    path('datasets/<int:pk>/download/', views.DatasetDownloadView.as_view(), name='dataset-download'),
+    path('datasets/<int:pk>/series/', views.DatasetSeriesView.as_view(), name='dataset-series'),
+    path('datasets/<int:pk>/query/', views.DatasetQueryView.as_view(), name='dataset-query'),
+    path('datasets/<int:pk>/download/', views.dataset_download, name='dataset-download'),
     path('datasets/<int:pk>/', views.DatasetDetailView.as_view(), name='dataset-detail'),
 ]
@@ -1,19 +1,58 @@
-import os, hashlib
-import pandas as pd
-from django.http import FileResponse, Http404
+import asyncio, functools, io, os, re
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import content_disposition_header, parse_etags
+from django.views.decorators.http import require_safe
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status, generics
-from .models import Dataset
-from .serializers import DatasetSerializer
+from rest_framework.pagination import CursorPagination
+from .models import Dataset, IngestJob, UploadSession
+from . import batch, columnar, framecache, jobs, metrics, stats, storage, uploads
+from .query import run_query, QueryError
+from .compare import summary_trend, equipment_changes, CompareError
+from .downsample import series, SeriesError
+from .sketches import SketchSet
+from .renderers import TABLE_RENDERERS
+from .serializers import DatasetSerializer, IngestJobSerializer, UploadSessionSerializer
 
-def checksum_file(fpath):
-    h = hashlib.sha256()
-    with open(fpath, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            h.update(chunk)
-    return h.hexdigest()
+def _etag(ds, *parts):
+    """ETag for a representation of ``ds``: its content checksum plus whatever else varies."""
+    if not ds.checksum:
+        return None
+    return '"%s"' % '-'.join([ds.checksum[:32], *map(str, parts)])
+
+class ParamError(ValueError):
+    pass
+
+def _int_param(request, name, default, minimum=None):
+    try:
+        value = int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        raise ParamError(f'{name} must be an integer')
+    if minimum is not None and value < minimum:
+        raise ParamError(f'{name} must be at least {minimum}')
+    return value
+
+def _conditional(request, etag, build):
+    """304 when If-None-Match already names ``etag``; otherwise build the response and tag it."""
+    # weak comparison: compression middleware marks the ETags it passes through as W/
+    held = [e.removeprefix('W/') for e in parse_etags(request.headers.get('If-None-Match', ''))]
+    hit = bool(etag) and etag in held
+    metrics.cache('etag', hit)
+    if hit:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = build()
+    if etag and response.status_code in (200, 304):
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept'])
+    return response
 
 class UploadCSVView(APIView):
     parser_classes = (MultiPartParser, FormParser)
@@ -22,67 +61,266 @@ class UploadCSVView(APIView):
         name = request.data.get('name') or (file_obj.name if file_obj else 'dataset')
         if not file_obj:
             return Response({'error':'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
-        ds = Dataset.objects.create(name=name, file=file_obj)
-        fpath = ds.file.path
+        if file_obj.size > settings.INGEST_MAX_BYTES:
+            return Response({'error':f'File exceeds the {settings.INGEST_MAX_BYTES} byte limit'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        job = storage.store_upload(file_obj, functools.partial(jobs.enqueue, name))
+        return Response(IngestJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class BatchUploadView(APIView):
+    """Many CSVs (``files``, repeated) and/or zips of them, ingested in parallel; answers once all are done."""
+    parser_classes = (MultiPartParser, FormParser)
+    def post(self, request):
+        files = request.FILES.getlist('files') + request.FILES.getlist('file')
+        if not files:
+            return Response({'error':'No files uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        for f in files:
+            if f.size > settings.INGEST_MAX_BYTES:
+                return Response({'error':f'{f.name} exceeds the {settings.INGEST_MAX_BYTES} byte limit'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        try:
+            report = batch.ingest(pair for f in files for pair in batch.expand(f.name, f))
+        except batch.BatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(dict(report, jobs=IngestJobSerializer(report['jobs'], many=True).data))
+
+class UploadSessionCreateView(APIView):
+    """Start a chunked upload: POST {name, size[, chunk_size]}, then PUT chunks and finalize."""
+    def post(self, request):
+        name = request.data.get('name') or 'dataset'
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            return Response({'error':'size (bytes) is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if size > settings.INGEST_MAX_BYTES:
+            return Response({'error':f'File exceeds the {settings.INGEST_MAX_BYTES} byte limit'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        try:
+            session = uploads.create(name, size, request.data.get('chunk_size'))
+        except (uploads.UploadError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+class UploadSessionView(generics.RetrieveDestroyAPIView):
+    # GET lists the chunks already received, so a client can resume
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerializer
+    def perform_destroy(self, instance):
+        uploads.abort(instance)
+
+class UploadChunkView(APIView):
+    def put(self, request, pk, index):
+        try: session = UploadSession.objects.get(pk=pk)
+        except UploadSession.DoesNotExist: raise Http404
+        # the body is streamed to disk; request.data is never parsed
         try:
-            df = pd.read_csv(fpath)
-        except Exception as e:
-            ds.delete()
-            return Response({'error':f'Invalid CSV: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
-        ds.row_count = len(df)
-        ds.checksum = checksum_file(fpath)
-        ds.save()
-        # keep last 5 datasets
-        qs = Dataset.objects.order_by('-upload_time')
-        to_delete = qs[5:]
-        for old in to_delete:
-            try: old.file.delete(save=False)
-            except: pass
-            old.delete()
-        return Response(DatasetSerializer(ds).data, status=status.HTTP_201_CREATED)
+            digest = uploads.write_chunk(session, index, request.stream or io.BytesIO(), request.headers.get('X-Chunk-Sha256'))
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'index': index, 'sha256': digest})
+
+class UploadFinalizeView(APIView):
+    def post(self, request, pk):
+        try: session = UploadSession.objects.get(pk=pk)
+        except UploadSession.DoesNotExist: raise Http404
+        try:
+            job = uploads.finalize(session, functools.partial(jobs.enqueue, session.name), request.data.get('sha256'))
+        except uploads.ChecksumError as e:
+            uploads.abort(session)
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(IngestJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class IngestJobView(generics.RetrieveAPIView):
+    queryset = IngestJob.objects.select_related('dataset')
+    serializer_class = IngestJobSerializer
+
+class DatasetPagination(CursorPagination):
+    # keyset paging on the upload_time index: no COUNT, no OFFSET however long the history
+    ordering = '-upload_time'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
 
 class DatasetListView(generics.ListAPIView):
     serializer_class = DatasetSerializer
-    def get_queryset(self):
-        return Dataset.objects.order_by('-upload_time')[:5]
+    pagination_class = DatasetPagination
+    queryset = Dataset.objects.all()
 
 class DatasetDetailView(generics.RetrieveDestroyAPIView):
     queryset = Dataset.objects.all()
     serializer_class = DatasetSerializer
+    def retrieve(self, request, *args, **kwargs):
+        ds = self.get_object()
+        # rows never change in place; pk and name cover the rest of the payload
+        return _conditional(request, _etag(ds, ds.pk, ds.name), lambda: Response(self.get_serializer(ds).data))
+    def perform_destroy(self, instance):
+        files = storage.files_of([instance])
+        key = (instance.pk, instance.checksum)
+        instance.delete()
+        framecache.invalidate([key])
+        storage.release(files)
+        stats.prune_orphans()
+
+def offload(view):
+    """Async wrapper running a sync view, rendering included, on a worker thread.
+
+    Under ASGI, plain sync views all take turns on one thread; this lets
+    I/O-bound ones overlap. Under WSGI it just adds a thread hop.
+    """
+    def call(request, *args, **kwargs):
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(call, thread_sensitive=False)(request, *args, **kwargs)
+    return wrapper
+
+STREAM_BLOCK = 256 * 1024
+
+def _chunks(request, f):
+    """Blocks of the open file ``f``, closing it at the end; async under ASGI so no thread waits on the client."""
+    if isinstance(request, ASGIRequest):
+        async def chunks():
+            try:
+                while block := await asyncio.to_thread(f.read, STREAM_BLOCK):
+                    yield block
+            finally:
+                f.close()
+        return chunks()
+    def chunks():
+        with f:
+            yield from iter(lambda: f.read(STREAM_BLOCK), b'')
+    return chunks()
 
-class DatasetDownloadView(APIView):
+@require_safe
+async def dataset_download(request, pk):
+    try: ds = await Dataset.objects.aget(pk=pk)
+    except Dataset.DoesNotExist: raise Http404
+    # blobs are stored under their checksum; hand back the uploaded name
+    filename = ds.name if ds.name.lower().endswith('.csv') else f'{ds.name}.csv'
+    cold = ds.file.name.endswith('.gz')
+    # cold tier: pass the gzip through when the client takes it, otherwise inflate on the fly
+    raw = not cold or re.search(r'\bgzip\b', request.headers.get('Accept-Encoding', ''))
+    f = await asyncio.to_thread(open, ds.file.path, 'rb') if raw else await asyncio.to_thread(storage.open_csv, ds.file.name)
+    if raw and not isinstance(request, ASGIRequest):
+        response = FileResponse(f, as_attachment=True, filename=filename, content_type='text/csv')
+    else:
+        response = StreamingHttpResponse(_chunks(request, f), content_type='text/csv')
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        if raw:
+            response['Content-Length'] = str(os.fstat(f.fileno()).st_size)
+    if cold:
+        if raw:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+class DatasetRowsView(APIView):
+    renderer_classes = TABLE_RENDERERS
+    json_layout = 'records'
     def get(self, request, pk):
         try: ds = Dataset.objects.get(pk=pk)
         except Dataset.DoesNotExist: raise Http404
-        return FileResponse(open(ds.file.path,'rb'), as_attachment=True, filename=os.path.basename(ds.file.path))
+        etag = _etag(ds, 'rows', request.accepted_renderer.format)
+        return _conditional(request, etag, lambda: self.page(request, ds))
+    def page(self, request, ds):
+        try:
+            page_size = _int_param(request, 'page_size', 50, minimum=1)
+            # ?after=<row> pages by cursor (row numbers are 0-based), ?page=<n> by offset
+            if 'after' in request.GET:
+                start = max(_int_param(request, 'after', -1) + 1, 0)
+            else:
+                start = (_int_param(request, 'page', 1, minimum=1)-1)*page_size
+        except ParamError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        end = start+page_size
+        columns = None
+        if request.GET.get('columns'):
+            columns = [c.strip() for c in request.GET['columns'].split(',') if c.strip()]
+            unknown = sorted(set(columns) - set(columnar.column_names(ds)))
+            if unknown:
+                return Response({'error':f'Unknown columns: {", ".join(unknown)}'}, status=status.HTTP_400_BAD_REQUEST)
+        # a cached frame is a slice away; otherwise the sidecar reads just this range,
+        # and only a CSV without one is worth loading whole
+        cached = framecache.get(ds, load=not columnar.has_sidecar(ds))
+        if cached is not None:
+            df = framecache.widen(cached.iloc[start:end][columns] if columns else cached.iloc[start:end])
+        else:
+            df = columnar.read_frame(ds, columns=columns, start=start, stop=end)
+        df = df.reset_index(drop=True)
+        total = ds.row_count
+        last = start + len(df) - 1
+        return Response({'frame': df, 'total': total, 'next': last if len(df) and last + 1 < total else None})
 
-class DatasetRowsView(APIView):
+class DatasetQueryView(APIView):
+    renderer_classes = TABLE_RENDERERS
+    json_layout = 'lists'
+    def post(self, request, pk):
+        try: ds = Dataset.objects.get(pk=pk)
+        except Dataset.DoesNotExist: raise Http404
+        try:
+            return Response(run_query(ds, request.data))
+        except QueryError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class DatasetCompareView(APIView):
+    def get(self, request):
+        try:
+            ids = [int(i) for i in request.GET.get('ids', '').split(',') if i.strip()]
+        except ValueError:
+            return Response({'error':'ids must be a comma separated list of dataset ids'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) < 2:
+            return Response({'error':'Pass at least two dataset ids, e.g. ?ids=3,4'}, status=status.HTTP_400_BAD_REQUEST)
+        found = Dataset.objects.in_bulk(ids)
+        missing = [i for i in ids if i not in found]
+        if missing:
+            return Response({'error':f'Unknown datasets: {missing}'}, status=status.HTTP_404_NOT_FOUND)
+        datasets = [found[i] for i in ids]
+        params = [p.strip() for p in request.GET.get('params', '').split(',') if p.strip()] or None
+        try:
+            equipment = equipment_changes(datasets, key=request.GET.get('key', 'Equipment ID'), params=params,
+                                          changed_only=request.GET.get('all') != '1',
+                                          limit=_int_param(request, 'limit', 1000, minimum=0))
+        except (CompareError, ParamError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'datasets': DatasetSerializer(datasets, many=True).data,
+            'summary': summary_trend(datasets),
+            'equipment': equipment,
+        })
+
+class DatasetSeriesView(APIView):
     def get(self, request, pk):
         try: ds = Dataset.objects.get(pk=pk)
         except Dataset.DoesNotExist: raise Http404
-        df = pd.read_csv(ds.file.path)
-        page = int(request.GET.get('page',1))
-        page_size = int(request.GET.get('page_size',50))
-        start = (page-1)*page_size
-        end = start+page_size
-        rows = df.iloc[start:end].fillna('').to_dict(orient='records')
-        return Response({'rows': rows, 'total': len(df)})
+        ys = [c.strip() for c in request.GET.get('y', '').split(',') if c.strip()]
+        if not ys:
+            return Response({'error':'Pass ?y=<column>[,<column>...]'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(series(ds, request.GET.get('x') or None, ys, _int_param(request, 'points', 2000),
+                                   request.GET.get('method', 'lttb')))
+        except (SeriesError, ParamError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 class DatasetSummaryView(APIView):
     def get(self, request, pk):
         try: ds = Dataset.objects.get(pk=pk)
         except Dataset.DoesNotExist: raise Http404
-        df = pd.read_csv(ds.file.path)
-        numeric = df.select_dtypes(include='number')
-        stats = {}
-        for col in numeric.columns:
-            series = numeric[col].dropna()
-            stats[col] = {
-                'count': int(series.count()),
-                'mean': float(series.mean()) if len(series) else None,
-                'median': float(series.median()) if len(series) else None,
-                'min': float(series.min()) if len(series) else None,
-                'max': float(series.max()) if len(series) else None,
-                'std': float(series.std()) if len(series) else None,
-            }
-        return Response({'summary': stats})
+        approx = request.GET.get('mode') == 'approx'
+        return _conditional(request, _etag(ds, 'approx' if approx else 'summary'), lambda: self.summary(ds, approx))
+    def summary(self, ds, approx):
+        obj = stats.summary_for(ds)
+        if approx:
+            if not obj.sketches:
+                obj = stats.store_summary(ds.checksum, obj.stats, stats.build_sketches(ds))
+            with metrics.span('stats'):
+                out = stats.approx_summary(SketchSet.from_dict(obj.sketches))
+            return Response(dict(out, mode='approx'))
+        return Response({'summary': obj.stats})
+
+def metrics_view(request):
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,168 @@
+"""End-to-end API benchmark through the Django test client.
+
+For each dataset size a synthetic CSV is generated (api.synthetic) and
+driven through upload (until its ingest job is done), rows paging,
+summary (exact and approx) and download. Each operation reports p50/p95
+latency, throughput and the process's peak RSS after it ran. Everything
+runs against a throwaway test database and a temporary MEDIA_ROOT.
+Ingest runs inline after the 202 (``INGEST_WORKERS=0``): the in-memory
+test database is shared-cache SQLite, whose table locks a background
+worker thread would collide with.
+
+    python benchmarks/bench_api.py --rows 10000,1000000 --out bench.json
+    python benchmarks/bench_api.py --rows 10000,1000000 --compare bench.json
+
+``--compare`` prints the p50 ratio against an earlier run's JSON (above 1
+is slower).
+"""
+import argparse, json, os, platform, resource, statistics, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+import django  # noqa: E402
+django.setup()
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+from api import jobs, synthetic  # noqa: E402
+from api.models import IngestJob  # noqa: E402
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+def summarize(times, units=None, unit=None):
+    """Latency percentiles in ms, plus ``unit``/s when ``units`` (per call) is given."""
+    ms = sorted(t * 1000 for t in times)
+    out = {'n': len(ms), 'p50_ms': round(statistics.median(ms), 2),
+           'p95_ms': round(ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))], 2),
+           'ops_per_s': round(len(ms) / (sum(ms) / 1000), 2)}
+    if units is not None:
+        out[f'{unit}_per_s'] = round(units * len(ms) / (sum(ms) / 1000), 1)
+    out['peak_rss_mb'] = peak_rss_mb()
+    return out
+
+def timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return times, result
+
+def check(r, expected=200):
+    if r.status_code != expected:
+        raise SystemExit(f'{r.request["PATH_INFO"]}: {r.status_code} {getattr(r, "content", b"")[:200]!r}')
+    return r
+
+def upload(c, path):
+    with open(path, 'rb') as f:
+        job = check(c.post('/api/upload/', {'file': f}), 202).json()
+    if jobs.claim(job['id']):
+        jobs.run(IngestJob.objects.get(pk=job['id']))
+    job = c.get(f"/api/jobs/{job['id']}/").json()
+    if job['phase'] == 'failed':
+        raise SystemExit(f'ingest failed: {job["error"]}')
+    return job['dataset']
+
+def run(c, rows, args, workdir):
+    path = os.path.join(workdir, f'equipment_{rows}.csv')
+    size = synthetic.write_csv(path, rows, nan_ratio=args.nan_ratio, types=args.types, materials=args.materials)
+    mb = size / 2**20
+    res = {'rows': rows, 'csv_mb': round(mb, 2)}
+
+    # repeated bytes are a dedup hit, so fresh-content uploads use one seed each
+    paths = [path]
+    for seed in range(1, args.repeat):
+        paths.append(os.path.join(workdir, f'equipment_{rows}_{seed}.csv'))
+        synthetic.write_csv(paths[-1], rows, nan_ratio=args.nan_ratio, types=args.types,
+                            materials=args.materials, seed=seed)
+    times = []
+    for p in paths:
+        times += timed(lambda: upload(c, p), 1)[0]
+        if p != path:
+            os.remove(p)
+    res['upload'] = summarize(times, mb, 'mb')
+    times, ds = timed(lambda: upload(c, path), args.repeat)
+    res['upload_dedup'] = summarize(times, mb, 'mb')
+
+    # the newest upload: retention may already have dropped the earlier ones
+    pk = ds['id']
+    pages = min(args.pages, max(1, rows // args.page_size))
+    for fmt in args.formats:
+        times = []
+        cursor = None
+        for page in range(pages):
+            url = f'/api/datasets/{pk}/rows/?page_size={args.page_size}&format={fmt}'
+            url += f'&after={cursor}' if cursor is not None else ''
+            t, r = timed(lambda: check(c.get(url)), 1)
+            times += t
+            cursor = page * args.page_size + args.page_size - 1
+        res[f'rows_{fmt}'] = summarize(times, args.page_size, 'rows')
+    res['summary'] = summarize(timed(lambda: check(c.get(f'/api/datasets/{pk}/summary/')), args.repeat)[0])
+    res['summary_approx'] = summarize(
+        timed(lambda: check(c.get(f'/api/datasets/{pk}/summary/?mode=approx')), args.repeat)[0])
+
+    def download():
+        r = check(c.get(f'/api/datasets/{pk}/download/'))
+        return sum(len(b) for b in r.streaming_content)
+    res['download'] = summarize(timed(download, args.repeat)[0], mb, 'mb')
+    return res
+
+def compare(current, previous):
+    old = {r['rows']: r for r in previous['results']}
+    for res in current['results']:
+        before = old.get(res['rows'])
+        if not before:
+            continue
+        for op, stats in res.items():
+            if isinstance(stats, dict) and op in before and before[op].get('p50_ms'):
+                ratio = stats['p50_ms'] / before[op]['p50_ms']
+                print(f'{res["rows"]:>10} {op:<16} p50 {before[op]["p50_ms"]:>10.2f} -> {stats["p50_ms"]:>10.2f} ms  x{ratio:.2f}')
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument('--rows', default='10000,100000')
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--pages', type=int, default=20, help='rows pages walked per format')
+    p.add_argument('--page-size', type=int, default=500)
+    p.add_argument('--formats', default='json,columnar,arrow')
+    p.add_argument('--nan-ratio', type=float, default=0.01)
+    p.add_argument('--types', type=int, default=6)
+    p.add_argument('--materials', type=int, default=5)
+    p.add_argument('--out', help='write results as JSON here')
+    p.add_argument('--compare', help='earlier --out file to compare p50s against')
+    args = p.parse_args(argv)
+    args.formats = [f for f in args.formats.split(',') if f]
+
+    setup_test_environment()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir, \
+            override_settings(MEDIA_ROOT=os.path.join(workdir, 'media'), INGEST_WORKERS=0,
+                              ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver']):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            c = Client()
+            for rows in [int(float(r)) for r in args.rows.split(',')]:
+                res = run(c, rows, args, workdir)
+                print(json.dumps(res))
+                results.append(res)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(), 'django': django.get_version(),
+                 'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                 'args': {k: v for k, v in vars(args).items() if k not in ('out', 'compare')}},
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main()
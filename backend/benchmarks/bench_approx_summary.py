@@ -0,0 +1,115 @@
+"""Exact vs sketch (?mode=approx) summary through the API: ingest overhead, latency and memory.
+
+For each size a synthetic CSV (api.synthetic) is uploaded through
+/api/upload/, against a throwaway test database like bench_api.py. Each
+size reports:
+
+- ingest: upload-to-done time, and how much of it went to building
+  sketches (the ``sketches`` span) next to CSV parsing
+- summary: p50/p95 of GET /summary/ and /summary/?mode=approx, both
+  served from the stored summary row
+- cold: one request of each with nothing stored, i.e. the exact figures
+  recomputed from the whole frame vs the sketches rebuilt from the sidecar
+- peak_mb: each path's own peak of Python and numpy allocations
+  (tracemalloc), from a separate untimed request so tracing does not
+  slow the timed one
+- the approximate medians' relative error against the exact ones
+
+The default sizes take a few GB of disk and, for the cold exact summary
+at 50M rows, several GB of memory:
+
+    python benchmarks/bench_approx_summary.py --out approx.json
+    python benchmarks/bench_approx_summary.py --rows 100000,1000000
+"""
+import argparse, json, os, tempfile, time, tracemalloc
+from bench_api import check, summarize, timed, upload
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment
+from api import framecache, metrics, synthetic
+from api.models import Dataset, DatasetSummary
+
+def medians(r):
+    return {c: s['median'] for c, s in r.json()['summary'].items()}
+
+def peak_mb(fn):
+    """Peak traced allocation while ``fn`` runs, in MB."""
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    finally:
+        tracemalloc.stop()
+
+def run(c, rows, args, workdir):
+    path = os.path.join(workdir, f'equipment_{rows}.csv')
+    size = synthetic.write_csv(path, rows, nan_ratio=args.nan_ratio)
+    res = {'rows': rows, 'csv_mb': round(size / 2**20, 2)}
+
+    with metrics.collect() as spans:
+        started = time.perf_counter()
+        pk = upload(c, path)['id']
+        seconds = time.perf_counter() - started
+    spent = lambda name: sum(t for n, t in spans if n == name)
+    res['ingest'] = {'seconds': round(seconds, 3), 'parse_seconds': round(spent('parse'), 3),
+                     'sketch_seconds': round(spent('sketches'), 3),
+                     'sketch_share': round(spent('sketches') / seconds, 3)}
+
+    url = f'/api/datasets/{pk}/summary/'
+    exact = lambda: check(c.get(url))
+    approx = lambda: check(c.get(url + '?mode=approx'))
+    for name, fn in (('summary_exact', exact), ('summary_approx', approx)):
+        res[name] = summarize(timed(fn, args.repeat)[0])
+        res[name]['peak_mb'] = peak_mb(fn)
+        del res[name]['peak_rss_mb']  # process lifetime high-water mark, the same for both
+
+    ds = Dataset.objects.get(pk=pk)
+    stored = DatasetSummary.objects.get(checksum=ds.checksum)
+    res['sketches_stored_kb'] = round(len(json.dumps(stored.sketches)) / 1024, 1)
+    def cold_approx():
+        DatasetSummary.objects.filter(checksum=ds.checksum).update(sketches={})
+        return approx()
+    def cold_exact():
+        DatasetSummary.objects.filter(checksum=ds.checksum).delete()
+        framecache.invalidate([(ds.pk, ds.checksum)])
+        return exact()
+    cold = {}
+    for name, fn in (('approx', cold_approx), ('exact', cold_exact)):
+        t, cold[name] = timed(fn, 1)
+        res[f'cold_{name}'] = {'seconds': round(t[0], 3), 'peak_mb': peak_mb(fn)}
+
+    approx, exact = medians(cold['approx']), medians(cold['exact'])
+    res['median_rel_error'] = {col: round(abs(approx[col] - m) / (abs(m) or 1), 5)
+                               for col, m in exact.items() if m is not None and approx.get(col) is not None}
+    os.remove(path)
+    return res
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument('--rows', default='1000000,10000000,50000000')
+    p.add_argument('--repeat', type=int, default=20)
+    p.add_argument('--nan-ratio', type=float, default=0.01)
+    p.add_argument('--out', help='write results as JSON here')
+    args = p.parse_args(argv)
+
+    setup_test_environment()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir, \
+            override_settings(MEDIA_ROOT=os.path.join(workdir, 'media'), INGEST_WORKERS=0,
+                              ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver']):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            c = Client()
+            for rows in [int(float(r)) for r in args.rows.split(',')]:
+                res = run(c, rows, args, workdir)
+                print(json.dumps(res))
+                results.append(res)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
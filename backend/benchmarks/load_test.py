@@ -0,0 +1,150 @@
+"""Concurrent load test against a running server.
+
+N client threads share one ``requests`` session pool and, for
+``--duration`` seconds each, pick an operation by weight:
+
+- ``upload``: a fresh synthetic CSV (a write: IngestJob, Dataset, summary)
+- ``rows``: a page of a seeded dataset
+- ``download``: the whole seeded CSV
+- ``list``: the dataset list
+
+Every concurrency level reports req/s, p50/p95 per operation and the
+errors: non-2xx responses, connection failures and uploads whose ingest
+job failed afterwards (e.g. "database is locked"). Compare configurations by restarting the server
+between runs:
+
+    SQLITE_TUNED=0 DJANGO_DEBUG=0 python manage.py runserver 8000 --noreload
+    DJANGO_DEBUG=0 uvicorn backend.asgi:application --port 8000 --workers 2
+
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --clients 1,8,32 --out tuned.json
+"""
+import argparse, collections, io, itertools, json, os, random, statistics, sys, threading, time
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api import synthetic  # noqa: E402
+
+def csv_bytes(rows, seed):
+    out = io.StringIO()
+    for i, df in enumerate(synthetic.frames(rows, nan_ratio=0.01, seed=seed)):
+        df.to_csv(out, index=False, header=i == 0)
+    return out.getvalue().encode()
+
+def session(pool):
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
+    return s
+
+def seed(s, url, rows):
+    r = s.post(f'{url}/api/upload/', files={'file': ('load_seed.csv', csv_bytes(rows, seed=0))})
+    r.raise_for_status()
+    job = r.json()
+    while job['phase'] not in ('done', 'failed'):
+        time.sleep(0.05)
+        job = s.get(f"{url}/api/jobs/{job['id']}/").json()
+    if job['phase'] == 'failed':
+        raise SystemExit(f'seed upload failed: {job["error"]}')
+    return job['dataset']['id']
+
+def level(s, url, pk, clients, args, seeds):
+    ops = {'upload': args.upload, 'rows': args.rows_weight, 'download': args.download, 'list': args.list}
+    names, weights = zip(*[(k, w) for k, w in ops.items() if w > 0])
+    times = collections.defaultdict(list)
+    errors = collections.Counter()
+    jobs = []
+    lock = threading.Lock()
+    stop = time.perf_counter() + args.duration
+
+    def request(op, rnd):
+        if op == 'upload':
+            n = next(seeds)
+            return s.post(f'{url}/api/upload/', files={'file': (f'load_{n}.csv', csv_bytes(args.upload_rows, seed=n))})
+        if op == 'rows':
+            after = rnd.randrange(max(1, args.seed_rows - args.page_size)) - 1
+            return s.get(f'{url}/api/datasets/{pk}/rows/?after={after}&page_size={args.page_size}')
+        if op == 'download':
+            return s.get(f'{url}/api/datasets/{pk}/download/')
+        return s.get(f'{url}/api/datasets/')
+
+    def client(i):
+        rnd = random.Random(i)
+        while time.perf_counter() < stop:
+            op = rnd.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                r = request(op, rnd)
+                r.content  # noqa: B018 -- read the whole body
+                key = None if r.ok else f'{op} {r.status_code}'
+                if op == 'upload' and r.ok:
+                    jobs.append(r.json()['id'])
+            except requests.RequestException as e:
+                key = f'{op} {type(e).__name__}'
+            elapsed = time.perf_counter() - started
+            with lock:
+                times[op].append(elapsed)
+                if key:
+                    errors[key] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    # ingest runs after the 202, so its failures only show on the job
+    for job in jobs:
+        while (state := s.get(f'{url}/api/jobs/{job}/').json())['phase'] not in ('done', 'failed'):
+            time.sleep(0.05)
+        if state['phase'] == 'failed':
+            errors[f'ingest: {state["error"]}'] += 1
+    total = sum(len(v) for v in times.values())
+    res = {'clients': clients, 'requests': total, 'req_per_s': round(total / wall, 1),
+           'errors': sum(errors.values()), 'error_kinds': dict(errors)}
+    for op, ts in sorted(times.items()):
+        ms = sorted(t * 1000 for t in ts)
+        res[op] = {'n': len(ms), 'p50_ms': round(statistics.median(ms), 1),
+                   'p95_ms': round(ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))], 1)}
+    return res
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument('--url', default='http://127.0.0.1:8000')
+    p.add_argument('--clients', default='1,8,32', help='concurrency levels, comma separated')
+    p.add_argument('--duration', type=float, default=15, help='seconds per level')
+    p.add_argument('--seed-rows', type=int, default=50_000, help='rows of the dataset the reads hit')
+    p.add_argument('--upload-rows', type=int, default=2_000)
+    p.add_argument('--page-size', type=int, default=500)
+    p.add_argument('--upload', type=float, default=1, help='weight of uploads in the mix')
+    p.add_argument('--rows', dest='rows_weight', type=float, default=6, help='weight of rows pages')
+    p.add_argument('--download', type=float, default=1)
+    p.add_argument('--list', type=float, default=2)
+    p.add_argument('--out', help='write results as JSON here')
+    args = p.parse_args(argv)
+    url = args.url.rstrip('/')
+    levels = [int(c) for c in args.clients.split(',') if c]
+
+    s = session(max(levels))
+    pk = seed(s, url, args.seed_rows)
+    # distinct content per upload, or dedup would skip the ingest
+    seeds = itertools.count(int(time.time()))
+    results = []
+    print(f'{"clients":>7} {"req/s":>8} {"errors":>7}  p50/p95 ms per operation')
+    for clients in levels:
+        res = level(s, url, pk, clients, args, seeds)
+        results.append(res)
+        ops = '  '.join(f'{op} {res[op]["p50_ms"]}/{res[op]["p95_ms"]}'
+                        for op in ('upload', 'rows', 'download', 'list') if op in res)
+        print(f'{clients:>7} {res["req_per_s"]:>8} {res["errors"]:>7}  {ops}')
+        if res['error_kinds']:
+            print(' ' * 18 + ', '.join(f'{k}: {v}' for k, v in sorted(res['error_kinds'].items())))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'url': url, 'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                       'args': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
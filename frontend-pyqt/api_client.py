@@ -0,0 +1,208 @@
+"""Shared HTTP client for the desktop app.
+
+One `requests.Session` is reused for every call, so connections to the
+backend are pooled and kept alive across requests and worker threads.
+Idempotent requests retry on connection errors and 502/503/504. GET
+responses that carry an ETag are cached by URL; the next request for the
+same URL sends `If-None-Match`, and a 304 is answered from the cache.
+
+Table endpoints (rows, query) are requested in the most compact layout
+this install can decode. That is an Arrow IPC stream when pyarrow is
+available, otherwise columnar JSON. requests negotiates gzip (and brotli,
+if installed) on its own.
+
+Files are uploaded through the chunked `/uploads/` protocol. Chunks go
+out in parallel, each with its SHA-256, and an interrupted upload of the
+same file picks up from the chunks the server already has.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import API_BASE
+
+ARROW = 'application/vnd.apache.arrow.stream'
+COLUMNAR = 'application/vnd.columnar+json'
+# one type only: DRF ranks the view's renderers above the client's q-values
+TABLE_ACCEPT = ARROW if importlib.util.find_spec('pyarrow') else COLUMNAR
+
+
+class ApiError(RuntimeError):
+    def __init__(self, status, body):
+        super().__init__(f'{status} {body}')
+        self.status = status
+        self.body = body
+
+
+class ApiClient:
+    def __init__(self, base=API_BASE, pool_size=10, retries=3, max_cached=256, timeout=30):
+        self.base = base.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({'GET', 'HEAD'}))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # (url, accept) -> (etag, decoded body), least recently used first
+        self._cache = OrderedDict()
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self.hits = 0
+        # (path, size, mtime) -> upload session id, for resuming
+        self._uploads = {}
+
+    def url(self, path):
+        return path if path.startswith(('http://', 'https://')) else self.base + '/' + path.lstrip('/')
+
+    def get_json(self, path, **params):
+        return self._get(path, params, 'application/json', lambda r: r.json())
+
+    def get_table(self, path, **params):
+        """GET a rows-style endpoint; returns ``(DataFrame, metadata)``."""
+        return self._get(path, params, TABLE_ACCEPT, _decode_table)
+
+    def _get(self, path, params, accept, decode):
+        url = requests.Request('GET', self.url(path), params=params or None).prepare().url
+        key = (url, accept)
+        with self._lock:
+            cached = self._cache.get(key)
+        headers = {'Accept': accept}
+        if cached:
+            headers['If-None-Match'] = cached[0]
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+        if r.status_code == 304 and cached:
+            with self._lock:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            return cached[1]
+        if r.status_code != 200:
+            raise ApiError(r.status_code, _body(r))
+        data = decode(r)
+        etag = r.headers.get('ETag')
+        if etag:
+            with self._lock:
+                self._cache[key] = (etag, data)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        return data
+
+    def post(self, path, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(self.url(path), **kwargs)
+
+    def upload_file(self, path, parallel=4, check=None, on_progress=None, chunk_size=None, chunk_retries=3):
+        """Upload ``path`` in chunks and finalize; returns the ingest job (202 body).
+
+        ``check()`` is called before each chunk and may raise to stop;
+        ``on_progress(bytes_done, bytes_total)`` may be called from any thread.
+        ``chunk_size`` defaults to the server's choice.
+        """
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        session = None
+        if key in self._uploads:
+            try:
+                session = self.get_json(f'uploads/{self._uploads[key]}/')
+            except (ApiError, requests.RequestException):
+                self._uploads.pop(key, None)
+        if session is None:
+            spec = {'name': os.path.basename(path), 'size': st.st_size}
+            if chunk_size:
+                spec['chunk_size'] = chunk_size
+            r = self.post('uploads/', json=spec)
+            if r.status_code != 201:
+                raise ApiError(r.status_code, _body(r))
+            session = r.json()
+            self._uploads[key] = session['id']
+
+        sid, chunk_size = session['id'], session['chunk_size']
+        have = set(session['received'])
+        todo = [i for i in range(session['chunk_count']) if i not in have]
+        done = [st.st_size - sum(min(chunk_size, st.st_size - i * chunk_size) for i in todo)]
+        lock = threading.Lock()
+        if on_progress:
+            on_progress(done[0], st.st_size)
+
+        def send(index):
+            if check:
+                check()
+            with open(path, 'rb') as f:
+                f.seek(index * chunk_size)
+                body = f.read(chunk_size)
+            headers = {'Content-Type': 'application/octet-stream',
+                       'X-Chunk-Sha256': hashlib.sha256(body).hexdigest()}
+            for attempt in range(chunk_retries):
+                try:
+                    r = self.session.put(self.url(f'uploads/{sid}/chunks/{index}/'), data=body,
+                                         headers=headers, timeout=self.timeout)
+                except requests.RequestException:
+                    if attempt + 1 == chunk_retries:
+                        raise
+                    continue
+                if r.status_code == 200:
+                    break
+                if attempt + 1 == chunk_retries:
+                    raise ApiError(r.status_code, _body(r))
+            with lock:
+                done[0] += len(body)
+                if on_progress:
+                    on_progress(done[0], st.st_size)
+
+        pool = ThreadPoolExecutor(max_workers=parallel, thread_name_prefix='upload')
+        try:
+            for future in as_completed([pool.submit(send, i) for i in todo]):
+                future.result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+        r = self.post(f'uploads/{sid}/finalize/')
+        if r.status_code != 202:
+            raise ApiError(r.status_code, _body(r))
+        self._uploads.pop(key, None)
+        return r.json()
+
+    def close(self):
+        self.session.close()
+
+
+def _decode_table(r):
+    import pandas as pd
+    if r.headers.get('Content-Type', '').split(';')[0].strip() == ARROW:
+        import pyarrow as pa
+        table = pa.ipc.open_stream(r.content).read_all()
+        meta = json.loads((table.schema.metadata or {}).get(b'meta', b'{}'))
+        return table.to_pandas(), meta
+    body = r.json()
+    if 'data' in body:
+        columns, data = body.pop('columns'), body.pop('data')
+        return pd.DataFrame({c: d for c, d in zip(columns, data)}, columns=columns), body
+    # plain JSON records (older servers)
+    return pd.DataFrame(body.pop('rows', [])), body
+
+
+def _body(r):
+    try:
+        return r.json()
+    except ValueError:
+        return r.text
+
+
+_client = None
+
+
+def client():
+    """The process-wide client (created on first use)."""
+    global _client
+    if _client is None:
+        _client = ApiClient()
+    return _client
@@ -0,0 +1,79 @@
+"""Desktop client startup cost, from `python -X importtime`, with regression thresholds.
+
+Each scenario runs in a fresh interpreter. Its import time is the sum of
+the top-level entries in the -X importtime report, so the interpreter's
+own startup is not counted. Scenarios:
+
+- website: `main.main(['--run', 'website'])` with the browser launch
+  stubbed out. It must not import any GUI or data library.
+- window: `import window`, the cost of showing the window before anything
+  is rendered.
+- render: `window` plus pandas, matplotlib's Qt backend, requests and the
+  table models, i.e. what the first chart and table need.
+
+The script exits non-zero if a scenario exceeds its budget or the website
+path imports a heavy module.
+
+    python benchmarks/bench_startup.py --repeat 5 --out startup.json
+"""
+import argparse, json, os, statistics, subprocess, sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('PyQt5', 'pandas', 'numpy', 'matplotlib', 'requests')
+
+SCENARIOS = {
+    'website': 'import main; main._open_website = lambda url: None; main.main(["--run", "website"])',
+    'window': 'import window',
+    'render': 'import window, pandas, requests, table_model, api_client; '
+              'import matplotlib.backends.backend_qt5agg, matplotlib.figure',
+}
+REPORT = 'import sys, json; print(json.dumps(sorted({m.split(".")[0] for m in sys.modules})))'
+
+def run(code):
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'{code}\n{REPORT}'], cwd=HERE,
+                          capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM='offscreen'))
+    if proc.returncode:
+        raise SystemExit(proc.stderr)
+    total = 0
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"; top-level rows are not indented
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit() and not name.startswith('  '):
+            total += int(cumulative)
+    return total / 1000, json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--max-website-ms', type=float, default=150)
+    p.add_argument('--max-window-ms', type=float, default=300)
+    p.add_argument('--out', help='write results as JSON here')
+    args = p.parse_args(argv)
+    budgets = {'website': args.max_website_ms, 'window': args.max_window_ms}
+    results, failures = {}, []
+    for name, code in SCENARIOS.items():
+        times, modules = [], []
+        for _ in range(args.repeat):
+            ms, modules = run(code)
+            times.append(ms)
+        res = {'median_ms': round(statistics.median(times), 1), 'min_ms': round(min(times), 1)}
+        if name in budgets:
+            res['budget_ms'] = budgets[name]
+            if res['median_ms'] > budgets[name]:
+                failures.append(f'{name}: {res["median_ms"]} ms > {budgets[name]} ms')
+        if name == 'website':
+            res['heavy_imports'] = [m for m in HEAVY if m in modules]
+            if res['heavy_imports']:
+                failures.append(f'website imports {", ".join(res["heavy_imports"])}')
+        print(json.dumps({name: res}))
+        results[name] = res
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    if failures:
+        sys.exit('startup regression: ' + '; '.join(failures))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import math
+
+from matplotlib.ticker import MaxNLocator
+
+STATS = (('mean', '#1f77b4'), ('median', '#ff7f0e'), ('min', '#2ca02c'), ('max', '#d62728'))
+WIDTH = 0.18
+
+
+class SummaryChart:
+    """Grouped mean/median/min/max bars per parameter, updated in place.
+
+    The axes, bars and value labels are built once per parameter list.
+    A new summary with the same parameters only changes bar heights and
+    label text. If the values still fit the current y range, just the
+    bars and labels are blitted over a saved background. Otherwise one
+    full redraw is done.
+    """
+
+    def __init__(self, fig, canvas):
+        self.fig = fig
+        self.canvas = canvas
+        self.ax = None
+        self.params = None
+        self.bars = []    # one BarContainer per stat
+        self.labels = []  # one list of annotations per stat
+        self._background = None
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _artists(self):
+        for bars, labels in zip(self.bars, self.labels):
+            yield from bars
+            yield from labels
+
+    def _on_draw(self, event):
+        # every full draw (resize, rebuild, new limits) refreshes the background used by blits
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self._artists():
+            self.fig.draw_artist(artist)
+
+    def update(self, summary):
+        params = [str(p) for p in summary]
+        values = [[_number(summary[p].get(stat)) if isinstance(summary[p], dict) else math.nan for p in summary]
+                  for stat, _ in STATS]
+        if params != self.params:
+            self._build(params)
+        if not params:
+            return
+        for bars, labels, heights in zip(self.bars, self.labels, values):
+            for bar, label, h in zip(bars, labels, heights):
+                bar.set_height(0 if math.isnan(h) else h)
+                label.set_visible(not math.isnan(h))
+                if not math.isnan(h):
+                    label.xy = (bar.get_x() + bar.get_width() / 2, h)
+                    label.set_text(f'{h:.2f}')
+        if self._fit_limits([h for heights in values for h in heights]) or self._background is None:
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self._background)
+            for artist in self._artists():
+                self.ax.draw_artist(artist)
+            self.canvas.blit(self.fig.bbox)
+
+    def _build(self, params):
+        self.fig.clear()
+        self.ax = ax = self.fig.add_subplot(111)
+        self.params = params
+        self.bars, self.labels = [], []
+        self._background = None
+        if not params:
+            ax.text(0.5, 0.5, 'No numeric columns to plot', ha='center', va='center')
+            self.canvas.draw_idle()
+            return
+        x = range(len(params))
+        for i, (stat, color) in enumerate(STATS):
+            offset = (i - 1.5) * WIDTH
+            # animated artists are left out of full draws and painted by _on_draw / blits
+            bars = ax.bar([xi + offset for xi in x], [0] * len(params), width=WIDTH, label=stat, color=color,
+                          animated=True)
+            self.bars.append(bars)
+            self.labels.append([
+                ax.annotate('', xy=(bar.get_x() + bar.get_width() / 2, 0), xytext=(0, 3), textcoords='offset points',
+                            ha='center', va='bottom', color='white', fontsize=8, animated=True)
+                for bar in bars
+            ])
+        ax.set_xticks(list(x))
+        ax.set_xticklabels(params, rotation=45, ha='right')
+        ax.set_xlim(-0.5, len(params) - 0.5)
+        ax.set_ylabel('Value')
+        ax.set_title('Summary statistics per Numeric Parameter')
+        ax.legend()
+
+    def _fit_limits(self, heights):
+        """Widen or shrink the y range when the data left it (or uses little of it); True if changed."""
+        finite = [h for h in heights if not math.isnan(h)]
+        lo, hi = min(finite + [0]), max(finite + [0])
+        cur_lo, cur_hi = self.ax.get_ylim()
+        span = (cur_hi - cur_lo) or 1
+        if cur_lo <= lo and hi <= cur_hi and (hi - lo) >= 0.6 * span:
+            return False
+        # nice round bounds with headroom for the value labels
+        ticks = MaxNLocator(nbins='auto').tick_values(lo, hi + 0.08 * ((hi - lo) or 1))
+        self.ax.set_ylim(min(ticks[0], lo), max(ticks[-1], hi))
+        return True
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
@@ -0,0 +1,159 @@
+"""Local cache of fetched datasets, backed by SQLite.
+
+Entries are keyed by dataset checksum. The summary and metadata sit in one
+row of `entries`. Rows are stored in fixed-size pages in `pages`, so a
+reader can load the metadata alone and then pull rows as they are needed.
+Once the stored bytes exceed `max_bytes`, the least recently used entries
+are evicted.
+
+The old cache layout (`latest.json` plus one `archive_<ts>.json` per
+fetch) is imported on first open, and the JSON files are then removed.
+"""
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+PAGE_ROWS = 500
+DB_NAME = 'cache.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    checksum TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    ds_id INTEGER,
+    uploaded_at TEXT,
+    summary TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    total INTEGER,
+    bytes INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS pages (
+    checksum TEXT NOT NULL REFERENCES entries (checksum) ON DELETE CASCADE,
+    page INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (checksum, page)
+) WITHOUT ROWID;
+"""
+
+_META = ('checksum', 'name', 'ds_id', 'uploaded_at', 'summary', 'row_count', 'total', 'last_used')
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+class LocalStore:
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.path = os.path.join(directory, DB_NAME)
+        self.max_bytes = max_bytes
+        # sqlite connections are per thread; rows may be read from the worker pool
+        self._local = threading.local()
+        with self._db() as db:
+            db.executescript(SCHEMA)
+        self.migrate_json()
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute('PRAGMA foreign_keys = ON')
+            db.execute('PRAGMA journal_mode = WAL')
+            self._local.db = db
+        return db
+
+    def put(self, checksum, name, summary, rows, ds_id=None, total=None, uploaded_at=None, last_used=None):
+        """Store (or replace) an entry and evict old ones past the size budget."""
+        summary_json = _dumps(summary)
+        pages = [_dumps(rows[i:i + PAGE_ROWS]) for i in range(0, len(rows), PAGE_ROWS)]
+        size = len(summary_json) + sum(len(p) for p in pages)
+        uploaded_at = uploaded_at or datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        with self._db() as db:
+            db.execute('DELETE FROM entries WHERE checksum = ?', (checksum,))
+            db.execute('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                       (checksum, name, ds_id, uploaded_at, summary_json, len(rows), total, size,
+                        last_used if last_used is not None else time.time()))
+            db.executemany('INSERT INTO pages VALUES (?, ?, ?)',
+                           [(checksum, i, p) for i, p in enumerate(pages)])
+            self._evict(db, keep=checksum)
+
+    def _evict(self, db, keep):
+        used = db.execute('SELECT COALESCE(SUM(bytes), 0) FROM entries').fetchone()[0]
+        if used <= self.max_bytes:
+            return
+        for checksum, size in db.execute('SELECT checksum, bytes FROM entries WHERE checksum != ? '
+                                         'ORDER BY last_used', (keep,)).fetchall():
+            db.execute('DELETE FROM entries WHERE checksum = ?', (checksum,))
+            used -= size
+            if used <= self.max_bytes:
+                break
+
+    def latest(self):
+        """Metadata and summary of the most recently used entry (no rows), or None."""
+        row = self._db().execute(f'SELECT {", ".join(_META)} FROM entries '
+                                 'ORDER BY last_used DESC LIMIT 1').fetchone()
+        if row is None:
+            return None
+        meta = dict(zip(_META, row))
+        meta['summary'] = json.loads(meta['summary'])
+        return meta
+
+    def rows(self, checksum, start=0, stop=None):
+        """Cached rows ``start:stop`` of an entry; only the pages covering them are read."""
+        first = start // PAGE_ROWS
+        query = 'SELECT data FROM pages WHERE checksum = ? AND page >= ?'
+        args = [checksum, first]
+        if stop is not None:
+            query += ' AND page <= ?'
+            args.append((stop - 1) // PAGE_ROWS)
+        out = []
+        for (data,) in self._db().execute(query + ' ORDER BY page', args):
+            out.extend(json.loads(data))
+        offset = start - first * PAGE_ROWS
+        return out[offset:None if stop is None else offset + stop - start]
+
+    def touch(self, checksum):
+        with self._db() as db:
+            db.execute('UPDATE entries SET last_used = ? WHERE checksum = ?', (time.time(), checksum))
+
+    def size(self):
+        return self._db().execute('SELECT COALESCE(SUM(bytes), 0) FROM entries').fetchone()[0]
+
+    def migrate_json(self):
+        """Import legacy ``archive_*.json``/``latest.json`` files, oldest first, then delete them.
+
+        Snapshots of the same data collapse into one entry, the newest.
+        """
+        paths = sorted(glob.glob(os.path.join(self.directory, 'archive_*.json')))
+        latest = os.path.join(self.directory, 'latest.json')
+        if os.path.exists(latest):
+            paths.append(latest)
+        newest, read = {}, []
+        for i, path in enumerate(paths):
+            try:
+                with open(path, 'rb') as f:
+                    payload = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f'Skipping unreadable cache file {path}:', e)
+                continue
+            read.append(path)
+            # old payloads have no checksum; key them by their data, not the file
+            # (each snapshot carries its own timestamp)
+            checksum = payload.get('checksum') or 'legacy-' + hashlib.sha256(json.dumps(
+                [payload.get('summary') or {}, payload.get('rows') or []],
+                sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+            # archive names sort by timestamp, so file order becomes recency (all older than new entries)
+            newest[checksum] = (i, payload)
+        for checksum, (i, payload) in newest.items():
+            rows = payload.get('rows') or []
+            self.put(checksum, payload.get('name', 'cached'), payload.get('summary') or {}, rows,
+                     uploaded_at=payload.get('uploaded_at'), total=len(rows), last_used=i)
+        for path in read:
+            os.remove(path)
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+
+import pandas as pd
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from workers import run_task
+
+
+def _columns(df):
+    """Column arrays for a DataFrame: one NumPy array per column, no per-cell objects."""
+    return [df[c].to_numpy() for c in df.columns]
+
+
+def _display(value):
+    if value is None:
+        return ''
+    try:
+        if pd.isna(value):
+            return ''
+    except (TypeError, ValueError):
+        pass
+    return str(value)
+
+
+class FrameTableModel(QAbstractTableModel):
+    """Read-only model over a DataFrame held in memory (e.g. the summary table)."""
+
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self.set_frame(df if df is not None else pd.DataFrame())
+
+    def set_frame(self, df):
+        self.beginResetModel()
+        self._headers = [str(c) for c in df.columns]
+        self._cols = _columns(df)
+        self._rows = len(df)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return _display(self._cols[index.column()][index.row()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+
+class PagedRowsModel(QAbstractTableModel):
+    """Model over `/api/datasets/<id>/rows/` that fetches pages as they scroll into view.
+
+    Only `max_pages` pages are kept (least recently used go first); each page
+    is stored as column arrays. `fetch_page(page)` returns the rows of a
+    0-based page as a list of dicts. Without a fetcher the model just shows
+    the rows it was seeded with.
+    """
+
+    def __init__(self, columns, total, fetch_page=None, page_size=50, max_pages=40, parent=None):
+        super().__init__(parent)
+        self._headers = [str(c) for c in columns]
+        self._total = int(total)
+        self._fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._pending = set()
+
+    def seed(self, page, rows):
+        self._store(page, rows)
+
+    def _store(self, page, rows):
+        df = pd.DataFrame(rows)
+        self._pages[page] = [df[c].to_numpy() if c in df.columns else None for c in self._headers]
+        self._pages.move_to_end(page)
+        if self._fetch_page is not None:
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def _request(self, page):
+        if self._fetch_page is None or page in self._pending:
+            return
+        self._pending.add(page)
+        # fetched on the thread pool; the view repaints when the page lands
+        run_task(lambda task: self._fetch_page(page),
+                 on_done=lambda rows: self.page_loaded(page, rows),
+                 on_error=lambda e: self._page_failed(page, e))
+
+    def _page_failed(self, page, err):
+        print(f'Failed to fetch rows page {page}:', err)
+        self._pending.discard(page)
+
+    def page_loaded(self, page, rows):
+        self._pending.discard(page)
+        self._store(page, rows)
+        first = page * self.page_size
+        last = min(first + len(rows), self._total) - 1
+        if last >= first:
+            # the model may have been replaced while the page was in flight
+            try:
+                self.dataChanged.emit(self.index(first, 0), self.index(last, len(self._headers) - 1))
+            except RuntimeError:
+                pass
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._total
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        page, offset = divmod(index.row(), self.page_size)
+        cols = self._pages.get(page)
+        if cols is None:
+            self._request(page)
+            return '…'
+        self._pages.move_to_end(page)
+        col = cols[index.column()]
+        if col is None or offset >= len(col):
+            return ''
+        return _display(col[offset])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
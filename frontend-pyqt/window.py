@@ -0,0 +1,364 @@
+import json
+import os
+import time
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QPushButton,
+    QFileDialog, QLabel, QTextEdit, QHBoxLayout,
+    QTableView, QProgressBar
+)
+from workers import run_task, gather, Cancelled
+from local_store import LocalStore
+
+# pandas, matplotlib, requests and the table models are imported on first
+# use: the window can be shown before any of them has loaded.
+
+
+def client():
+    from api_client import client as shared
+    return shared()
+
+
+class MainWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle('Chemical Equipment Visualizer')
+        self.resize(1000, 700)
+
+        # storage directory for cached/archived datasets
+        self.storage_dir = os.path.join(os.path.dirname(__file__), 'stored_data')
+        os.makedirs(self.storage_dir, exist_ok=True)
+
+        layout = QVBoxLayout()
+
+        # Upload button, with progress + cancel shown while an upload runs
+        upload_row = QHBoxLayout()
+        self.upload_btn = QPushButton('Upload your data or CSV')
+        self.upload_btn.clicked.connect(self.upload)
+        upload_row.addWidget(self.upload_btn)
+        self.upload_progress = QProgressBar()
+        self.upload_progress.setRange(0, 100)
+        self.upload_progress.hide()
+        upload_row.addWidget(self.upload_progress)
+        self.cancel_btn = QPushButton('Cancel')
+        self.cancel_btn.clicked.connect(self.cancel_upload)
+        self.cancel_btn.hide()
+        upload_row.addWidget(self.cancel_btn)
+        layout.addLayout(upload_row)
+        self._upload_task = None
+
+        # Status label
+        self.status = QLabel('')
+        layout.addWidget(self.status)
+
+        # (no toggle button) — desktop will always show Given Data, Summary and Chart
+
+        # Text box (shows raw summary JSON)
+        self.summary = QTextEdit()
+        self.summary.setReadOnly(True)
+        layout.addWidget(self.summary)
+
+        # Plot area (created on first render, then added into content area)
+        self.fig = None
+        self.canvas = None
+
+        # area where tables / other output will be placed; cleared between uploads
+        self.content_layout = QVBoxLayout()
+        layout.addLayout(self.content_layout)
+
+        # tables + chart stack, built on first render (see _ensure_content)
+        self._content = None
+
+        # cached last-rendered payload (kept for potential future use)
+        self._last_summary = None
+        self._last_rows = None
+
+        self.setLayout(layout)
+
+        # show the most recently fetched dataset from the local store, once
+        # the event loop runs so the window paints before pandas/matplotlib load
+        self.store = LocalStore(self.storage_dir)
+        QTimer.singleShot(0, self._load_and_display_cached)
+
+    def _ensure_canvas(self):
+        if self.canvas is None:
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+            from matplotlib.figure import Figure
+            self.fig = Figure(figsize=(6, 3))
+            self.canvas = FigureCanvas(self.fig)
+        return self.canvas
+
+    # ----------------- cached data helpers -----------------
+    def _load_and_display_cached(self):
+        try:
+            meta = self.store.latest()
+            if meta is None:
+                return
+            checksum = meta['checksum']
+            self.store.touch(checksum)
+            # only the first page is read now; the table pulls the rest from the store on scroll
+            page_size = 50
+            rows = self.store.rows(checksum, 0, page_size)
+            self.display_summary_and_rows(meta['summary'], rows, total=meta['row_count'],
+                                          fetch_page=lambda page: self.store.rows(checksum, page * page_size,
+                                                                                  (page + 1) * page_size))
+            name, uploaded_at = meta['name'], meta['uploaded_at']
+            if uploaded_at:
+                self.status.setText(f'Loaded cached dataset: {name} (uploaded {uploaded_at})')
+            else:
+                self.status.setText(f'Loaded cached dataset: {name}')
+        except Exception as e:
+            # don't block startup on cache errors
+            print('Failed to load cached data:', e)
+
+    def _save_cache(self, checksum, name, summary, rows, ds_id=None, total=None):
+        """Store the fetched summary + rows in the local store (keyed by dataset checksum)"""
+        self.store.put(checksum, name, summary, rows, ds_id=ds_id, total=total)
+
+    def _ensure_content(self):
+        """Build the tables + chart stack once; later renders only swap models and data."""
+        if self._content is not None:
+            return
+        from chart import SummaryChart
+        vbox = QVBoxLayout()
+
+        # --- Given Data (raw table) ---
+        # virtualized: the view only asks the model for visible cells
+        self.table_raw = QTableView()
+        vbox.addWidget(QLabel("Given Data"))
+        vbox.addWidget(self.table_raw)
+
+        # --- Summary / Output table (hidden when there is no summary) ---
+        self.summary_label = QLabel("Output (Summary Statistics)")
+        self.table_summary = QTableView()
+        vbox.addWidget(self.summary_label)
+        vbox.addWidget(self.table_summary)
+
+        # --- Chart (always shown) ---
+        vbox.addWidget(QLabel("Output Chart"))
+        vbox.addWidget(self._ensure_canvas())
+        self.chart = SummaryChart(self.fig, self.canvas)
+
+        self.content_layout.addLayout(vbox)
+        self._content = vbox
+
+    def display_summary_and_rows(self, summary, rows, ds_id=None, total=None, fetch_page=None):
+        """Render the chart and two tables (summary & raw rows) in the UI.
+
+        summary: dict mapping column -> stats
+        rows: list of row dicts (the first page)
+        ds_id/total: when given, further pages are fetched from the backend
+        as the raw table is scrolled (or through `fetch_page(page)` instead)
+
+        Widgets and chart artists are reused between calls; only the table
+        models and bar values change, and an unchanged summary is skipped.
+        """
+        import pandas as pd
+        from table_model import FrameTableModel, PagedRowsModel
+        self._ensure_content()
+
+        summary_changed = summary != self._last_summary
+        # remember last payload so toggle can re-render without refetch
+        self._last_summary = summary
+        self._last_rows = rows
+
+        if summary_changed:
+            # Update textual summary box
+            try:
+                self.summary.setPlainText(json.dumps(summary, indent=2))
+            except Exception:
+                self.summary.setPlainText(str(summary))
+
+            try:
+                df_summary = pd.DataFrame(summary).T
+                df_summary.reset_index(inplace=True)
+                df_summary.rename(columns={'index': 'Parameter'}, inplace=True)
+            except Exception:
+                df_summary = pd.DataFrame()
+            model = self.table_summary.model()
+            if model is None:
+                self.table_summary.setModel(FrameTableModel(df_summary, parent=self.table_summary))
+            else:
+                model.set_frame(df_summary)
+            self.summary_label.setVisible(not df_summary.empty)
+            self.table_summary.setVisible(not df_summary.empty)
+
+            # --- Plot: grouped bar of mean, median, min and max ---
+            try:
+                self.chart.update(summary if isinstance(summary, dict) else {})
+            except Exception as e:
+                print('Plot error:', e)
+
+        # --- raw rows: a fresh paged model per dataset, same view ---
+        old = self.table_raw.model()
+        columns = list(pd.DataFrame(rows).columns) if rows else []
+        if columns:
+            page_size = max(len(rows), 1)
+            fetch = fetch_page
+            if fetch is None and ds_id is not None:
+                fetch = lambda page: self._fetch_rows_page(ds_id, page, page_size)
+            model_raw = PagedRowsModel(columns, total if total is not None else len(rows),
+                                       fetch_page=fetch, page_size=page_size, parent=self.table_raw)
+            model_raw.seed(0, rows)
+            self.table_raw.setModel(model_raw)
+        else:
+            self.table_raw.setModel(None)
+        if old is not None:
+            old.deleteLater()
+
+    def _fetch_rows_page(self, ds_id, page, page_size):
+        return client().get_table(f"datasets/{ds_id}/rows/", page=page + 1, page_size=page_size)[0]
+
+    def upload(self):
+        """Upload the CSV file to the Django backend (in the background)"""
+        if self._upload_task is not None:
+            return
+        path, _ = QFileDialog.getOpenFileName(self, 'Select CSV', '', 'CSV Files (*.csv)')
+        if not path:
+            return
+
+        self.upload_btn.setEnabled(False)
+        self.upload_progress.setValue(0)
+        self.upload_progress.show()
+        self.cancel_btn.show()
+        self.status.setText('Uploading ' + os.path.basename(path))
+        self._upload_task = run_task(self._upload_worker, path, on_done=self._upload_done,
+                                     on_error=self._upload_failed, on_progress=self._upload_progress)
+
+    def cancel_upload(self):
+        if self._upload_task is not None:
+            self._upload_task.cancel()
+            self.status.setText('Cancelling upload...')
+
+    @staticmethod
+    def _upload_worker(path, task):
+        """Runs on the thread pool: send the file in parallel chunks, then poll the ingest job."""
+        last = [-1]
+
+        def sent(done, total):
+            pct = 100 * done // total if total else 0
+            if pct != last[0]:
+                last[0] = pct
+                task.report(('uploading', done, total, 0))
+
+        # a cancelled or failed upload of the same file resumes from the chunks already sent
+        job = client().upload_file(path, check=task.check, on_progress=sent)
+
+        # ingest runs in the background on the server; poll the job until it settles
+        while job.get('phase') not in ('done', 'failed'):
+            task.report((job.get('phase'), job.get('bytes_processed') or 0, job.get('bytes_total') or 0, job.get('rows', 0)))
+            for _ in range(5):
+                task.check()
+                time.sleep(0.1)
+            job = client().get_json(f"jobs/{job['id']}/")
+        return job
+
+    def _upload_progress(self, info):
+        phase, done, total, rows = info
+        pct = 100 * done // total if total else 0
+        self.upload_progress.setValue(pct)
+        if phase == 'uploading':
+            self.status.setText(f'Uploading: {pct}%')
+        else:
+            self.status.setText(f"Processing upload: {phase} {pct}% — rows: {rows}")
+
+    def _upload_finished(self):
+        self._upload_task = None
+        self.upload_btn.setEnabled(True)
+        self.upload_progress.hide()
+        self.cancel_btn.hide()
+
+    def _upload_failed(self, err):
+        self._upload_finished()
+        if isinstance(err, Cancelled):
+            self.status.setText('Upload cancelled')
+        else:
+            self.status.setText(f'Error: {err}')
+
+    def _upload_done(self, job):
+        self._upload_finished()
+        if job.get('phase') == 'failed':
+            self.status.setText('Error: ' + job.get('error', 'ingest failed'))
+            return
+        ds = job.get('dataset') or {}
+        self.status.setText('Uploaded: ' + ds.get('name', ''))
+        ds_id = ds.get('id')
+        if ds_id:
+            # call dataset-specific summary endpoint
+            self.fetch_summary(ds_id)
+        else:
+            self.status.setText('Uploaded but backend did not return dataset id')
+
+    def fetch_summary(self, ds_id):
+        """Fetch dataset-specific summary and show a short result in the UI.
+
+        Summary (`/api/datasets/<id>/summary/`), a first page of rows
+        (`/api/datasets/<id>/rows/`) and the dataset detail (for its name)
+        are requested concurrently; the UI is updated once all three return.
+        """
+        base = f"datasets/{ds_id}"
+        api = client()
+        self.status.setText('Fetching summary...')
+        gather({
+            'summary': lambda task: api.get_json(f"{base}/summary/"),
+            'rows': lambda task: api.get_table(f"{base}/rows/", page=1, page_size=50),
+            'detail': lambda task: api.get_json(f"{base}/"),
+        }, lambda results, errors: self._show_fetched(ds_id, results, errors))
+
+    def _show_fetched(self, ds_id, results, errors):
+        if 'summary' not in results:
+            self.status.setText(f"Failed to fetch summary: {errors.get('summary')}")
+            return
+        summary = results['summary'].get('summary', {})
+
+        # a small sample of rows to show count and to cache
+        rows, total = [], None
+        if 'rows' in results:
+            frame, meta = results['rows']
+            # plain records for the table seed and the local store
+            rows = frame.astype(object).where(frame.notna(), None).to_dict(orient='records')
+            total = meta.get('total', None)
+            if total is not None:
+                self.status.setText(f"Summary fetched — rows: {total}")
+            else:
+                self.status.setText('Summary fetched')
+        else:
+            self.status.setText('Summary fetched (rows unavailable)')
+
+        # render the fetched summary and rows into the UI
+        try:
+            self.display_summary_and_rows(summary, rows, ds_id=ds_id, total=total)
+        except Exception as e:
+            print('Failed to render fetched data:', e)
+
+        # dataset detail gives a name and checksum for caching
+        detail = results.get('detail', {})
+        name = detail.get('name', f'dataset_{ds_id}')
+        checksum = detail.get('checksum') or f'dataset-{ds_id}'
+
+        # save summary + sample rows to local cache so it's available when user is not uploading
+        try:
+            self._save_cache(checksum, name, summary, rows, ds_id=ds_id, total=total)
+        except Exception as e:
+            print('Failed to save cache:', e)
+
+    def toggle_summary(self):
+        """Toggle visibility of the Summary Statistics table on the desktop UI.
+
+        When toggled, re-render the last-known payload (if any) so the
+        summary table appears or disappears immediately without requiring a
+        backend refetch.
+        """
+        try:
+            self._summary_visible = bool(self.summary_toggle_btn.isChecked())
+            if self._summary_visible:
+                self.summary_toggle_btn.setText('Hide Summary Statistics')
+            else:
+                self.summary_toggle_btn.setText('Show Summary Statistics')
+
+            # re-render last payload if present
+            if self._last_summary is not None or self._last_rows is not None:
+                self.display_summary_and_rows(self._last_summary or {}, self._last_rows or [])
+        except Exception as e:
+            print('Error toggling summary view:', e)
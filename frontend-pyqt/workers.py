@@ -0,0 +1,87 @@
+"""Background work for the desktop client: network calls run on a QThreadPool
+and report back to the GUI thread through Qt signals."""
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Cancelled(Exception):
+    pass
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    progress = pyqtSignal(object)
+
+
+class Task(QRunnable):
+    """Runs `fn(*args, task=self)` on the pool; `fn` may call `task.report(...)`
+    and should check `task.cancelled` (or call `task.check()`) in long loops."""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    def report(self, value):
+        self.signals.progress.emit(value)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, task=self)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+_tasks = set()
+
+
+def run_task(fn, *args, on_done=None, on_error=None, on_progress=None):
+    """Start `fn` on the global pool and wire its signals; returns the Task."""
+    task = Task(fn, *args)
+    # keep a Python reference until the task reports back
+    _tasks.add(task)
+    task.signals.finished.connect(lambda _: _tasks.discard(task))
+    task.signals.failed.connect(lambda _: _tasks.discard(task))
+    if on_done:
+        task.signals.finished.connect(on_done)
+    if on_error:
+        task.signals.failed.connect(on_error)
+    if on_progress:
+        task.signals.progress.connect(on_progress)
+    QThreadPool.globalInstance().start(task)
+    return task
+
+
+def gather(calls, on_done):
+    """Run several `name -> fn(task=...)` calls concurrently and call
+    `on_done(results, errors)` on the GUI thread once all have returned."""
+    results, errors = {}, {}
+    pending = set(calls)
+
+    def settle(name, ok, value):
+        (results if ok else errors)[name] = value
+        pending.discard(name)
+        if not pending:
+            on_done(results, errors)
+
+    return [
+        run_task(fn, on_done=lambda v, n=name: settle(n, True, v), on_error=lambda e, n=name: settle(n, False, e))
+        for name, fn in calls.items()
+    ]
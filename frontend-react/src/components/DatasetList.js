@@ -4,16 +4,18 @@ import { API_BASE } from '../config';
 import DatasetView from './DatasetView';
 export default function DatasetList(){
   const [datasets, setDatasets] = useState([]);
+  const [next, setNext] = useState(null);
   const [selected, setSelected] = useState(null);
   useEffect(()=>{ fetchList(); }, []);
-  async function fetchList(){
-    try{ const res = await axios.get(`${API_BASE}/datasets/`);
-     setDatasets(res.data);
+  async function fetchList(url){
+    try{ const res = await axios.get(url || `${API_BASE}/datasets/`);
+     setDatasets(prev => url ? [...prev, ...res.data.results] : res.data.results);
+     setNext(res.data.next);
      }catch(err){ console.error(err); }
   }
   return (
     <div className='card'>
-      <h3>Last 5 Datasets</h3>
+      <h3>Recent Datasets</h3>
       <ul>
         {datasets.map(d=>(
           <li key={d.id}>
@@ -21,6 +23,7 @@ export default function DatasetList(){
           </li>
         ))}
       </ul>
+      {next && <button onClick={()=>fetchList(next)}>Load more</button>}
       {selected && <DatasetView dataset={selected} />}
     </div>
   );
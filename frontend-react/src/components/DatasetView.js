@@ -21,6 +21,7 @@ ChartJS.register(CategoryScale, LinearScale, PointElement, LineElement, BarEleme
 export default function DatasetView({dataset}){
   const [summary, setSummary] = useState({});
   const [rows, setRows] = useState([]);
+  const [series, setSeries] = useState({});
   useEffect(()=>{ if(dataset) fetchSummary(); }, [dataset]);
   async function fetchSummary(){
     const res = await axios.get(`${API_BASE}/datasets/${dataset.id}/summary/`);
@@ -31,24 +32,26 @@ export default function DatasetView({dataset}){
   // may prefer server-side paging or a download/export feature.
   const r = await axios.get(`${API_BASE}/datasets/${dataset.id}/rows/?page_size=100000`);
   setRows(r.data.rows || []);
+  // line chart points come downsampled from the server, whatever the row count
+  const cols = Object.keys(res.data.summary || {}).slice(0,2);
+  if(cols.length){
+    const s = await axios.get(`${API_BASE}/datasets/${dataset.id}/series/?y=${encodeURIComponent(cols.join(','))}&points=1000`);
+    setSeries(s.data.series || {});
+  }
   }
 
   // Determine numeric columns (keys from summary)
   const numericCols = Object.keys(summary || {});
 
-  // Chart for rows (line) - keep in case needed
-  const chartCols = numericCols.slice(0,2);
+  // Chart for rows (line): downsampled series from /series/
+  const chartCols = Object.keys(series);
   const chartDataRows = {
-    labels: rows.map((_,i)=> String(i+1)),
     datasets: chartCols.map((col, idx) => ({
       label: col,
-      data: rows.map(r => {
-        const v = r[col];
-        const n = typeof v === 'number' ? v : parseFloat(v);
-        return Number.isFinite(n) ? n : null;
-      }),
+      data: series[col].x.map((x, i) => ({ x, y: series[col].y[i] })),
       borderColor: idx === 0 ? '#1f77b4' : '#ff7f0e', // blue / orange
       backgroundColor: idx === 0 ? 'rgba(255, 255, 255, 0.15)' : 'rgba(255,127,14,0.15)',
+      pointRadius: 0,
       tension: 0.2,
       fill: false,
       spanGaps: true,
@@ -83,6 +86,11 @@ export default function DatasetView({dataset}){
       y: { ticks: { color: '#ffffff' }, grid: { color: 'rgba(255,255,255,0.06)' } }
     }
   };
+  // series points are {x, y} with a numeric row axis
+  const lineOptions = Object.assign({}, chartOptions, {
+    parsing: false,
+    scales: Object.assign({}, chartOptions.scales, { x: Object.assign({ type: 'linear' }, chartOptions.scales.x) })
+  });
   // ref + click handler state for showing clicked value
   const barChartRef = useRef(null);
   const [clickedPoint, setClickedPoint] = useState(null);
@@ -200,6 +208,12 @@ export default function DatasetView({dataset}){
           ) : (
             <div style={{color:'#ffffff'}}><strong>No numeric columns to chart</strong></div>
           )}
+          {chartCols.length > 0 && (
+            <div style={{marginBottom:12, background:'#0b0b0b', padding:12, borderRadius:6}}>
+              <h5 style={{color:'#ffffff', marginTop:0}}>Trend by row (downsampled)</h5>
+              <Line data={chartDataRows} options={lineOptions} />
+            </div>
+          )}
         </div>
       </div>
 
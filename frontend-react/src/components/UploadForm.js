@@ -1,6 +1,18 @@
 import React, {useState} from 'react';
 import axios from 'axios';
 import { API_BASE } from '../config';
+
+// ingest runs in the background; poll the job until it is done or failed
+async function waitForJob(job, onProgress){
+  while(job.phase !== 'done' && job.phase !== 'failed'){
+    onProgress(job);
+    await new Promise(r => setTimeout(r, 500));
+    const res = await axios.get(`${API_BASE}/jobs/${job.id}/`);
+    job = res.data;
+  }
+  return job;
+}
+
 export default function UploadForm(){
   const [file, setFile] = useState(null);
   const [message, setMessage] = useState('');
@@ -11,7 +23,12 @@ export default function UploadForm(){
     form.append('file', file);
     try{
       const res = await axios.post(`${API_BASE}/upload/`, form, { headers: {'Content-Type':'multipart/form-data'} });
-      setMessage('Uploaded: ' + res.data.name);
+      const job = await waitForJob(res.data, j => {
+        const pct = j.bytes_total ? ` ${Math.floor(100 * j.bytes_processed / j.bytes_total)}%` : '';
+        setMessage(`Processing: ${j.phase}${pct} (${j.rows} rows)`);
+      });
+      if(job.phase === 'failed') setMessage('Upload error: ' + job.error);
+      else setMessage('Uploaded: ' + job.dataset.name);
     }catch(err){
       setMessage('Upload error: ' + (err.response?.data?.error || err.message));
     }